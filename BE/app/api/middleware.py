@@ -5,11 +5,45 @@ from flask import jsonify
 from flask_cors import CORS
 from datetime import datetime
 import traceback
+from config import ComplianceConfig
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 def setup_cors(app):
     """Setup CORS configuration"""
     CORS(app, origins=["http://localhost:5173", "http://localhost:3000"], supports_credentials=True)
 
+def setup_json(app):
+    """Encode JSON responses with orjson when it is installed"""
+    if not ORJSON_AVAILABLE:
+        return
+    
+    from flask.json.provider import DefaultJSONProvider
+    
+    class OrjsonProvider(DefaultJSONProvider):
+        """Flask's default provider with orjson doing the encoding.
+        
+        Keeps Flask's key sorting and its fallbacks (datetimes as HTTP dates,
+        Decimal, etc.) by routing unsupported types through the default hook.
+        """
+        
+        def dumps(self, obj, **kwargs):
+            option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+            if kwargs.get("sort_keys", self.sort_keys):
+                option |= orjson.OPT_SORT_KEYS
+            if kwargs.get("indent"):
+                option |= orjson.OPT_INDENT_2
+            return orjson.dumps(obj, default=self.default, option=option).decode("utf-8")
+        
+        def loads(self, s, **kwargs):
+            return orjson.loads(s)
+    
+    app.json = OrjsonProvider(app)
+
 def setup_error_handlers(app):
     """Setup global error handlers"""
     
@@ -51,6 +85,7 @@ def setup_error_handlers(app):
         }
         
         print(f"❌ Unhandled exception: {error_details}")
-        print(f"Traceback: {traceback.format_exc()}")
+        if ComplianceConfig.VERBOSE:
+            print(f"Traceback: {traceback.format_exc()}")
         
         return jsonify(error_details), 500
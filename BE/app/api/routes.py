@@ -1,7 +1,6 @@
 """
 API Routes for Compliance Analysis
 """
-import asyncio
 import json
 from datetime import datetime
 from typing import Dict, List, Any
@@ -9,6 +8,8 @@ import traceback
 
 from flask import Blueprint, request, jsonify
 from services.compliance_service import ComplianceService
+from utils.concurrency import run_async
+from config import ComplianceConfig
 
 api_bp = Blueprint('api', __name__)
 
@@ -76,7 +77,9 @@ def analyze_features():
             }), 400
         
         data = request.get_json()
-        print(f"📥 Received data: {data}")
+        # Dumping the whole payload costs a full repr per request - only when asked for
+        if ComplianceConfig.VERBOSE:
+            print(f"📥 Received data: {data}")
         
         # Check if it's batch processing or single feature
         if "items" in data and isinstance(data["items"], list):
@@ -84,82 +87,83 @@ def analyze_features():
             items = data["items"]
             print(f"📦 Processing {len(items)} items in batch")
             
-            # Run async analysis for all items
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
+            # Convert to expected format for service
+            feature_batch = [
+                {
+                    "featureName": item.get("feature_name", ""),
+                    "description": item.get("description", "")
+                }
+                for item in items
+            ]
             
-            try:
-                analysis_results = []
-                for i, item in enumerate(items):
-                    print(f"🔄 Processing item {i+1}/{len(items)}: {item.get('feature_name', 'Unknown')}")
-                    
-                    # Convert to expected format for service
-                    feature_data = {
-                        "featureName": item.get("feature_name", ""),
-                        "description": item.get("description", "")
-                    }
-                    
-                    result = loop.run_until_complete(compliance_service.analyze_feature(feature_data))
-                    
-                    # Add the optional ID if provided
-                    if "id" in item:
-                        result["id"] = item["id"]
-                    
-                    analysis_results.append(result)
+            def _report(i, result):
+                if isinstance(result, Exception):
+                    print(f"❌ Item {i+1} failed: {result}")
+                else:
                     print(f"✅ Completed item {i+1}: {result.get('feature_name', 'Unknown')}")
+            
+            # Analyze all items concurrently (bounded by MAX_PARALLEL_ANALYSES), logging each as it
+            # finishes; any failed item fails the request, so stop starting new ones after a failure
+            batch_results = run_async(compliance_service.analyze_features_batch(
+                feature_batch, on_result=_report, fail_fast=True
+            ))
+            
+            # Any failed item fails the request, as with sequential processing
+            error = next((r for r in batch_results if isinstance(r, Exception)), None)
+            if error is not None:
+                raise error
+            
+            analysis_results = []
+            for item, result in zip(items, batch_results):
+                # Add the optional ID if provided
+                if "id" in item:
+                    result["id"] = item["id"]
                 
-                print(f"📤 All {len(analysis_results)} analyses completed")
-                
-                response = {
-                    "status": "success",
-                    "timestamp": datetime.now().isoformat(),
-                    "analysis_results": analysis_results,
-                    "total_processed": len(analysis_results)
-                }
-                
-                return jsonify(response)
-            finally:
-                loop.close()
+                analysis_results.append(result)
+            
+            print(f"📤 All {len(analysis_results)} analyses completed")
+            
+            response = {
+                "status": "success",
+                "timestamp": datetime.now().isoformat(),
+                "analysis_results": analysis_results,
+                "total_processed": len(analysis_results)
+            }
+            
+            return jsonify(response)
         else:
             # Single feature processing (backward compatibility)
             print("📋 Processing single feature")
             
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            
-            try:
-                result = loop.run_until_complete(compliance_service.analyze_feature(data))
+            result = run_async(compliance_service.analyze_feature(data))
+            if ComplianceConfig.VERBOSE:
                 print(f"📤 Analysis result: {result}")
-                
-                # Wrap result in expected format for frontend
-                response = {
-                    "status": "success",
-                    "timestamp": datetime.now().isoformat(),
-                    "analysis_results": [result]
-                }
-                
-                return jsonify(response)
-            finally:
-                loop.close()
+            else:
+                print(f"📤 Analysis result: {result.get('feature_name', 'Unknown')} - {result.get('risk_level', 'unknown')} risk")
+            
+            # Wrap result in expected format for frontend
+            response = {
+                "status": "success",
+                "timestamp": datetime.now().isoformat(),
+                "analysis_results": [result]
+            }
+            
+            return jsonify(response)
     
     except Exception as e:
-        # Log the full error for debugging
         error_details = {
             "error": str(e),
             "error_type": type(e).__name__,
-            "traceback": traceback.format_exc(),
             "status": "error",
             "timestamp": datetime.now().isoformat()
         }
         
         print(f"❌ Analysis error: {error_details}")
+        # Formatting the traceback is only worth it when someone asked to see it
+        if ComplianceConfig.VERBOSE:
+            print(f"Traceback: {traceback.format_exc()}")
         
-        return jsonify({
-            "error": str(e),
-            "error_type": type(e).__name__,
-            "status": "error",
-            "timestamp": datetime.now().isoformat()
-        }), 500
+        return jsonify(error_details), 500
 
 @api_bp.route('/analyze/sample', methods=['GET'])
 def analyze_sample():
@@ -174,23 +178,16 @@ def analyze_sample():
         }
         
         # Run analysis
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
+        result = run_async(compliance_service.analyze_feature(sample_data))
         
-        try:
-            result = loop.run_until_complete(compliance_service.analyze_feature(sample_data))
-            
-            response = {
-                "status": "success",
-                "timestamp": datetime.now().isoformat(),
-                "analysis_results": [result],
-                "note": "This is a sample analysis with predefined features"
-            }
-            
-            return jsonify(response)
-            
-        finally:
-            loop.close()
+        response = {
+            "status": "success",
+            "timestamp": datetime.now().isoformat(),
+            "analysis_results": [result],
+            "note": "This is a sample analysis with predefined features"
+        }
+        
+        return jsonify(response)
     
     except Exception as e:
         return jsonify({
@@ -3,8 +3,10 @@ Main Flask application entry point
 """
 import os
 from flask import Flask
-from app.api.routes import api_bp
-from app.api.middleware import setup_cors, setup_error_handlers
+from config import ComplianceConfig
+from utils.concurrency import run_async
+from app.api.routes import api_bp, compliance_service
+from app.api.middleware import setup_cors, setup_error_handlers, setup_json
 
 def create_app():
     """Application factory pattern"""
@@ -12,11 +14,16 @@ def create_app():
     
     # Setup middleware
     setup_cors(app)
+    setup_json(app)
     setup_error_handlers(app)
     
     # Register blueprints
     app.register_blueprint(api_bp)
     
+    # Load the shared analyzer up front so the first request isn't a cold start
+    if ComplianceConfig.WARMUP_ON_START:
+        run_async(compliance_service.warmup())
+    
     return app
 
 def main():
@@ -26,14 +33,17 @@ def main():
     # Get port from environment variable or default to 5000
     port = int(os.environ.get('FLASK_PORT', 5000))
     
-    print("🚀 Starting TikTok Compliance Analysis API...")
-    print(f"📡 Port: {port}")
-    print("📡 Available endpoints:")
-    print("   GET  / - API information")
-    print("   GET  /health - Health check")
-    print("   POST /analyze - Analyze features")
-    print("   GET  /analyze/sample - Sample analysis")
-    print()
+    # Startup banner in one write
+    print("\n".join([
+        "🚀 Starting TikTok Compliance Analysis API...",
+        f"📡 Port: {port}",
+        "📡 Available endpoints:",
+        "   GET  / - API information",
+        "   GET  /health - Health check",
+        "   POST /analyze - Analyze features",
+        "   GET  /analyze/sample - Sample analysis",
+        ""
+    ]))
     
     app.run(host='0.0.0.0', port=port, debug=False)
 
@@ -34,14 +34,43 @@ class ComplianceConfig:
     RELEVANCE_THRESHOLD = 0.5
     MAX_STATUTES_PER_FEATURE = 10
     BATCH_SIZE = 5
+    # Max features analyzed concurrently (caps in-flight LLM/vector store calls)
+    MAX_PARALLEL_ANALYSES = int(os.getenv("COMPLIANCE_MAX_PARALLEL", "8"))
+    # Max sub-agents running at once across concurrent feature analyses
+    MAX_PARALLEL_AGENTS = int(os.getenv("COMPLIANCE_MAX_PARALLEL_AGENTS", "12"))
+    # Max concurrent OpenRouter requests (agents and direct analysis share the pool)
+    LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "16"))
+    
+    # Build the analyzer and prime models/connections when the API starts
+    WARMUP_ON_START = os.getenv("COMPLIANCE_WARMUP", "true").lower() == "true"
+    
+    # Concurrent statute searches are coalesced into one batched vector query
+    SEARCH_MAX_BATCH = int(os.getenv("SEARCH_MAX_BATCH", "16"))
+    SEARCH_BATCH_WINDOW_MS = float(os.getenv("SEARCH_BATCH_WINDOW_MS", "5"))
+    
+    # Print request payloads, full results and error tracebacks (formatting them is skipped otherwise)
+    VERBOSE = os.getenv("COMPLIANCE_VERBOSE", "false").lower() == "true"
     
     # Cache Configuration
     ENABLE_CACHE = True
     CACHE_EXPIRY_DAYS = 30
+    LLM_CACHE_EXPIRY_DAYS = 1
+    # Analyses kept in ComplianceService's in-memory LRU
+    RESULT_CACHE_SIZE = int(os.getenv("RESULT_CACHE_SIZE", "256"))
+    # Reuse LLM responses of near-duplicate features (off by default - similar wording isn't the same feature)
+    ENABLE_SEMANTIC_CACHE = os.getenv("ENABLE_SEMANTIC_CACHE", "false").lower() == "true"
+    # Minimum cosine similarity for reusing an LLM response from a near-duplicate feature
+    SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.92"))
+    # Bump when prompts or synthesis logic change to invalidate cached analyses
+    PROMPT_VERSION = "v1"
     
     # Vector Store Configuration
     EMBEDDING_MODEL = "all-MiniLM-L6-v2"
     VECTOR_DB_PATH = "./chroma_db"
+    # "chroma" (persistent HNSW) or "faiss" (in-memory exact search, suited to small statute corpora)
+    VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "chroma").lower()
+    # FAISS index encoding: "sq8" (int8 scalar-quantized, 4x smaller) or "flat" (float32)
+    FAISS_INDEX_TYPE = os.getenv("FAISS_INDEX_TYPE", "sq8").lower()
     
     # Geographic regions for filtering
     US_STATES = [
@@ -4,7 +4,8 @@ import json
 from datetime import datetime
 from services.jargon_service import JargonService
 from config import ComplianceConfig
-from utils.relevance import calculate_relevance_score, is_relevant_compliance, parse_compliance_requirements
+from utils.concurrency import run_blocking
+from utils.relevance import calculate_relevance_scores, is_relevant_compliance, parse_compliance_requirements
 
 class ComplianceAgent:
     """Base agent class"""
@@ -35,17 +36,23 @@ class ComplianceAgent:
 
 class LegalAnalysisAgent(ComplianceAgent):
     """Analyzes legal requirements"""
-    def __init__(self, vector_store, llm_client=None):
+    def __init__(self, vector_store, llm_client=None, statute_search=None):
         super().__init__("Legal Analyst", "Identify applicable regulations")
         self.vector_store = vector_store
         self.llm_client = llm_client
+        # Optional async search(query, n_results) that batches with other in-flight searches
+        self.statute_search = statute_search
     
     async def analyze(self, feature: Dict) -> Dict:
         # Find relevant regulations
         feature_description = feature.get('description', '')
-        relevant_regs = self.vector_store.search_relevant_statutes(
-            feature_description, n_results=10
-        )
+        # Vector search is blocking - run it off the loop so the other agents proceed meanwhile
+        if self.statute_search is not None:
+            relevant_regs = await self.statute_search(feature_description, 10)
+        else:
+            relevant_regs = await run_blocking(
+                self.vector_store.search_relevant_statutes, feature_description, 10
+            )
         
         analysis = {
             "agent": self.name,
@@ -96,14 +103,21 @@ Focus on applicable regulations, risk assessment, and implementation requirement
         
         # Fallback to original vector search analysis if no LLM or LLM failed
         if not analysis["applicable_regulations"] and relevant_regs['documents'] and relevant_regs['documents'][0]:
+            # Score every regulation in one batch, so the feature text is analyzed once
+            candidates = [
+                (i, doc, metadata)
+                for i, (doc, metadata) in enumerate(zip(relevant_regs['documents'][0], relevant_regs['metadatas'][0]))
+                if doc and metadata
+            ]
+            relevance_scores = calculate_relevance_scores(
+                feature_description,
+                [doc for _, doc, _ in candidates],
+                [metadata for _, _, metadata in candidates],
+                min_score=ComplianceConfig.RELEVANCE_THRESHOLD
+            )
+            
             # Analyze each regulation
-            for i, (doc, metadata) in enumerate(zip(relevant_regs['documents'][0], relevant_regs['metadatas'][0])):
-                if not doc or not metadata:
-                    continue
-                    
-                # Calculate relevance score
-                relevance_score = calculate_relevance_score(feature_description, doc, metadata)
-                
+            for (i, doc, metadata), relevance_score in zip(candidates, relevance_scores):
                 if relevance_score >= ComplianceConfig.RELEVANCE_THRESHOLD:
                     reg_analysis = {
                         "regulation": metadata.get('title', f'Document {i+1}'),
@@ -545,14 +559,29 @@ class ValidationAgent(ComplianceAgent):
 
 class MultiAgentOrchestrator:
     """Orchestrates multiple agents for comprehensive analysis"""
-    def __init__(self, vector_store, jargon_resolver: JargonService, llm_client=None):
+    def __init__(self, vector_store, jargon_resolver: JargonService, llm_client=None, statute_search=None):
         self.agents = [
             IntentClassificationAgent(jargon_resolver),
-            LegalAnalysisAgent(vector_store, llm_client),
+            LegalAnalysisAgent(vector_store, llm_client, statute_search),
             TechnicalAnalysisAgent()
         ]
         self.validator = ValidationAgent()
         self.jargon_resolver = jargon_resolver
+        # Caps agents running at once across every feature analyzed on the current loop
+        self._semaphore = None
+        self._semaphore_loop = None
+    
+    def _agent_semaphore(self) -> asyncio.Semaphore:
+        """Semaphore bound to the running event loop (each API request runs its own loop)"""
+        loop = asyncio.get_running_loop()
+        if self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(ComplianceConfig.MAX_PARALLEL_AGENTS)
+            self._semaphore_loop = loop
+        return self._semaphore
+    
+    async def _run_agent(self, agent: ComplianceAgent, feature: Dict) -> Dict:
+        async with self._agent_semaphore():
+            return await agent.analyze(feature)
     
     async def analyze_feature(self, feature: Dict) -> Dict:
         """Run comprehensive multi-agent analysis"""
@@ -567,7 +596,7 @@ class MultiAgentOrchestrator:
         
         # Run all agents in parallel
         try:
-            tasks = [agent.analyze(expanded_feature) for agent in self.agents]
+            tasks = [self._run_agent(agent, expanded_feature) for agent in self.agents]
             agent_results = await asyncio.gather(*tasks, return_exceptions=True)
             
             # Filter out exceptions and log them
@@ -2,18 +2,21 @@
 Unified Compliance Analyzer - Combines the best of enhanced_main.py and feature_compliance_analyzer.py
 """
 import asyncio
+import atexit
+import functools
+import hashlib
 import json
-import requests
 from datetime import datetime, timezone
-from typing import Dict, List, Any, Optional
-from dataclasses import dataclass, asdict
+from typing import Dict, List, Any, Optional, Tuple
+from dataclasses import dataclass, fields
 
 from core.llm_client import LLMClient
 from services.jargon_service import JargonService
 from services.vector_service import VectorService, get_vector_store
 from core.agents import MultiAgentOrchestrator
-from core.cache import ComplianceCache
+from core.cache import ComplianceCache, SemanticCache
 from config import ComplianceConfig
+from utils.concurrency import MicroBatcher, run_blocking
 
 @dataclass
 class ComplianceResult:
@@ -31,6 +34,24 @@ class ComplianceResult:
     llm_analysis: Optional[Dict] = None
     timestamp: str = ""
 
+# Field names for the shallow dict returned by _synthesize_analysis
+_RESULT_FIELDS = tuple(f.name for f in fields(ComplianceResult))
+
+# Weights for the confidence factors, in the order they are collected (agents and LLM first)
+_CONFIDENCE_WEIGHTS = (0.3, 0.3, 0.2, 0.2)
+
+# Feature names that fallback confidence treats as well understood
+_KNOWN_FEATURE_PATTERNS = (
+    'age verification', 'content moderation', 'location', 'recommendation',
+    'authentication', 'privacy', 'security', 'compliance'
+)
+
+@functools.lru_cache(maxsize=4096)
+def _confidence_variation(feature_name: str) -> float:
+    """Stable +/- 0.05 offset derived from the feature name, so identical scores are spread out"""
+    feature_hash = hashlib.md5(feature_name.encode()).hexdigest()
+    return (int(feature_hash[:2], 16) % 10) / 100 - 0.05
+
 class UnifiedComplianceAnalyzer:
     """
     Unified compliance analyzer that handles both single features and codebase analysis
@@ -41,13 +62,64 @@ class UnifiedComplianceAnalyzer:
         self.jargon_service = JargonService()
         # Force vector store initialization - always use RAG
         self.vector_service = self._force_vector_store_init()
-        self.agent_orchestrator = MultiAgentOrchestrator(self.vector_service, self.jargon_service, self.llm_client)
+        # Statute searches from concurrent analyses (agents and direct) go out as one batched query
+        self.statute_search = MicroBatcher(
+            self._search_statutes_batch,
+            max_batch=ComplianceConfig.SEARCH_MAX_BATCH,
+            window_ms=ComplianceConfig.SEARCH_BATCH_WINDOW_MS
+        )
+        self.agent_orchestrator = MultiAgentOrchestrator(
+            self.vector_service, self.jargon_service, self.llm_client, statute_search=self.search_statutes
+        )
         self.cache = ComplianceCache()
+        # Near-duplicate features reuse an earlier LLM response (ChromaDB only, opt-in)
+        if ComplianceConfig.ENABLE_CACHE and ComplianceConfig.ENABLE_SEMANTIC_CACHE:
+            self.semantic_cache = SemanticCache(
+                self.vector_service,
+                threshold=ComplianceConfig.SEMANTIC_CACHE_THRESHOLD,
+                model=ComplianceConfig.OPENROUTER_MODEL,
+                prompt_version=ComplianceConfig.PROMPT_VERSION,
+                expiry_days=ComplianceConfig.LLM_CACHE_EXPIRY_DAYS
+            )
+        else:
+            self.semantic_cache = None
+            if ComplianceConfig.ENABLE_CACHE:
+                print("ℹ️ Semantic LLM cache disabled (set ENABLE_SEMANTIC_CACHE=true to enable)")
+            else:
+                print("ℹ️ Semantic LLM cache disabled (ComplianceConfig.ENABLE_CACHE is off)")
         
         print("🔗 Unified Compliance Analyzer initialized")
         print(f"🔗 OpenRouter model: {ComplianceConfig.OPENROUTER_MODEL}")
         print(f"🔑 API key configured: {'Yes' if ComplianceConfig.OPENROUTER_API_KEY else 'No (using mock responses)'}")
-        print(f"📚 RAG Status: {'✅ ChromaDB' if hasattr(self.vector_service, 'client') else '🔄 SimpleFallbackStore (Forced RAG)'}")
+        print(f"📚 RAG Status: {'✅ ChromaDB' if hasattr(self.vector_service, 'client') else '✅ FAISS' if hasattr(self.vector_service, 'index') else '🔄 SimpleFallbackStore (Forced RAG)'}")
+    
+    async def search_statutes(self, query: str, n_results: int = 10) -> Dict:
+        """Vector search that shares a batched query with other in-flight searches"""
+        return await self.statute_search.submit((query, n_results))
+    
+    def _search_statutes_batch(self, requests: List[Tuple[str, int]]) -> List[Dict]:
+        """Run coalesced (query, n_results) searches - one batched call per distinct n_results"""
+        results = [None] * len(requests)
+        by_n = {}
+        for i, (_, n_results) in enumerate(requests):
+            by_n.setdefault(n_results, []).append(i)
+        for n_results, indices in by_n.items():
+            batch = self.vector_service.batch_search_relevant_statutes(
+                [requests[i][0] for i in indices], n_results=n_results
+            )
+            for i, result in zip(indices, batch):
+                results[i] = result
+        return results
+    
+    def warmup(self):
+        """Prime the embedding model and the OpenRouter connection so the first
+        request doesn't pay for model load and TLS handshake"""
+        try:
+            self.vector_service.search_relevant_statutes("warmup", n_results=1)
+        except Exception as e:
+            print(f"⚠️ Vector store warmup failed: {e}")
+        self.llm_client.warmup()
+        print("🔥 Analyzer warmed up")
     
     def _force_vector_store_init(self):
         """Force vector store initialization - always enable RAG even with fallback"""
@@ -73,21 +145,35 @@ class UnifiedComplianceAnalyzer:
             ]
             
             legal_docs = None
+            corpus_hash = None
             for path in possible_paths:
                 if os.path.exists(path):
-                    with open(path, 'r', encoding='utf-8') as f:
-                        loaded = json.load(f)
-                        if isinstance(loaded, dict) and isinstance(loaded.get('documents'), list):
-                            legal_docs = loaded.get('documents', [])
-                        elif isinstance(loaded, list):
-                            legal_docs = loaded
-                        elif isinstance(loaded, dict):
-                            legal_docs = [loaded]
-                        break
+                    with open(path, 'rb') as f:
+                        raw = f.read()
+                    corpus_hash = hashlib.sha256(raw).hexdigest()
+                    
+                    # Persisted index already built from this exact corpus - skip parsing and re-ingestion
+                    if vector_store.is_corpus_current(corpus_hash):
+                        print(f"📚 Legal corpus unchanged - reusing {vector_store.get_document_count()} persisted documents")
+                        return
+                    
+                    loaded = json.loads(raw.decode('utf-8'))
+                    if isinstance(loaded, dict) and isinstance(loaded.get('documents'), list):
+                        legal_docs = loaded.get('documents', [])
+                    elif isinstance(loaded, list):
+                        legal_docs = loaded
+                    elif isinstance(loaded, dict):
+                        legal_docs = [loaded]
+                    break
             
             if legal_docs:
                 vector_store.add_documents(legal_docs)
                 doc_count = vector_store.get_document_count()
+                # Only record the corpus once every document made it in, so a partial ingest is retried next run
+                if doc_count >= len(legal_docs):
+                    vector_store.mark_corpus(corpus_hash)
+                else:
+                    print(f"⚠️ Only {doc_count} of {len(legal_docs)} legal documents were ingested - corpus will be reloaded next run")
                 print(f"📚 Loaded {doc_count} legal documents for enhanced RAG analysis")
             else:
                 print("⚠️ No legal documents found - RAG will use general knowledge")
@@ -115,14 +201,23 @@ class UnifiedComplianceAnalyzer:
         resolved_description = self.jargon_service.expand_description(description)
         print(f"📝 Resolved description: {resolved_description}")
         
-        # Step 2: Multi-agent analysis
-        agent_results = await self.agent_orchestrator.analyze_feature({
-            'feature_name': feature_name,
-            'description': resolved_description
-        })
+        # Step 2 + 3: Multi-agent and LLM analysis are independent - run them concurrently
+        agent_results, llm_analysis = await asyncio.gather(
+            self.agent_orchestrator.analyze_feature({
+                'feature_name': feature_name,
+                'description': resolved_description
+            }),
+            self._get_llm_analysis(feature_name, resolved_description),
+            return_exceptions=True
+        )
         
-        # Step 3: LLM analysis
-        llm_analysis = await self._get_llm_analysis(feature_name, resolved_description)
+        # A failure on one side still leaves the other side's findings to synthesize
+        if isinstance(agent_results, Exception):
+            print(f"⚠️ Multi-agent analysis failed: {agent_results}")
+            agent_results = {}
+        if isinstance(llm_analysis, Exception):
+            print(f"⚠️ Enhanced LLM analysis failed: {llm_analysis}")
+            llm_analysis = self._fallback_llm_analysis(llm_analysis)
         
         # Step 4: Synthesize results
         result = self._synthesize_analysis(
@@ -137,11 +232,24 @@ class UnifiedComplianceAnalyzer:
     async def _get_llm_analysis(self, feature_name: str, description: str) -> Dict:
         """Enhanced LLM analysis with forced RAG integration"""
         # Force retrieve relevant legal documents from vector store
+        # Semantic cache: a close-enough earlier feature skips retrieval and the LLM call.
+        # Mock responses (no API key) are never cached.
+        use_semantic_cache = (
+            self.semantic_cache is not None and self.semantic_cache.enabled and bool(self.llm_client.api_key)
+        )
+        cache_key = f"{feature_name}\n{description}"
+        if use_semantic_cache:
+            cached = await run_blocking(self.semantic_cache.get, cache_key)
+            if cached is not None:
+                print("♻️ Semantic cache hit - reusing LLM analysis of a similar feature")
+                return self._parse_enhanced_llm_response(cached)
+        
         retrieved_docs = None
         try:
             print("📚 Forcing RAG: Retrieving relevant legal documents...")
             search_query = f"{feature_name} {description}"
-            retrieved_docs = self.vector_service.search_relevant_statutes(search_query, n_results=5)
+            # Batched with concurrent searches and run in a thread, so the agent pipeline keeps going meanwhile
+            retrieved_docs = await self.search_statutes(search_query, n_results=5)
             doc_count = len(retrieved_docs.get('documents', [[]])[0]) if retrieved_docs else 0
             print(f"   📊 RAG Retrieved: {doc_count} relevant documents")
         except Exception as e:
@@ -173,23 +281,30 @@ class UnifiedComplianceAnalyzer:
                 retrieved_docs=retrieved_docs
             )
             
+            if use_semantic_cache and not response.startswith("Error"):
+                await run_blocking(self.semantic_cache.put, cache_key, response)
+            
             # Parse enhanced response format
             return self._parse_enhanced_llm_response(response)
             
         except Exception as e:
             print(f"⚠️ Enhanced LLM analysis failed: {e}")
-            return {
-                "raw_response": f"Enhanced LLM analysis unavailable: {str(e)}",
-                "analysis_type": "fallback",
-                "confidence": 0.3,
-                "rag_used": True,
-                "enhanced_patterns": [],
-                "compliance_insights": {
-                    "overall_assessment": "Analysis failed - manual review required",
-                    "key_risks": ["Analysis system error"],
-                    "implementation_suggestions": ["Manual compliance review needed"]
-                }
+            return self._fallback_llm_analysis(e)
+    
+    def _fallback_llm_analysis(self, error: Exception) -> Dict:
+        """LLM analysis placeholder used when the LLM step fails"""
+        return {
+            "raw_response": f"Enhanced LLM analysis unavailable: {str(error)}",
+            "analysis_type": "fallback",
+            "confidence": 0.3,
+            "rag_used": True,
+            "enhanced_patterns": [],
+            "compliance_insights": {
+                "overall_assessment": "Analysis failed - manual review required",
+                "key_risks": ["Analysis system error"],
+                "implementation_suggestions": ["Manual compliance review needed"]
             }
+        }
     
     def _parse_enhanced_llm_response(self, response: str) -> Dict:
         """Parse enhanced LLM response matching code_analyzer_llm_clean format"""
@@ -264,9 +379,9 @@ class UnifiedComplianceAnalyzer:
         # Extract applicable regulations
         applicable_regulations = self._extract_regulations(agent_results, llm_analysis)
         
-        # Generate implementation notes
+        # Generate implementation notes (reuses the risk level computed above)
         implementation_notes = self._generate_implementation_notes(
-            feature_name, description, agent_results, llm_analysis
+            feature_name, description, agent_results, llm_analysis, risk_level
         )
         
         # Calculate overall confidence
@@ -300,7 +415,9 @@ class UnifiedComplianceAnalyzer:
             timestamp=datetime.now(timezone.utc).isoformat()
         )
         
-        return asdict(result)
+        # Shallow projection - asdict() would deep-copy the nested agent/LLM payloads,
+        # which were built for this result alone
+        return {name: getattr(result, name) for name in _RESULT_FIELDS}
     
     def _calculate_risk_level(self, agent_results: Dict, llm_analysis: Dict) -> str:
         """Calculate overall risk level based on agent and LLM analysis with smart fallbacks"""
@@ -423,15 +540,12 @@ class UnifiedComplianceAnalyzer:
         regulation_triggers = self._identify_regulation_triggers(agent_results, llm_analysis)
         regulations.extend(regulation_triggers)
         
-        # Remove duplicates
-        seen_names = set()
-        unique_regulations = []
+        # Remove duplicates (first occurrence of each name wins, order kept)
+        unique_regulations = {}
         for reg in regulations:
-            if reg['name'] not in seen_names:
-                unique_regulations.append(reg)
-                seen_names.add(reg['name'])
+            unique_regulations.setdefault(reg['name'], reg)
         
-        return unique_regulations
+        return list(unique_regulations.values())
     
     def _identify_regulation_triggers(self, agent_results: Dict, llm_analysis: Dict) -> List[Dict]:
         """Identify regulations based on actual analysis content"""
@@ -546,12 +660,14 @@ class UnifiedComplianceAnalyzer:
         return context
     
     def _generate_implementation_notes(self, feature_name: str, description: str,
-                                     agent_results: Dict, llm_analysis: Dict) -> List[str]:
+                                     agent_results: Dict, llm_analysis: Dict,
+                                     risk_level: Optional[str] = None) -> List[str]:
         """Generate implementation notes based on actual analysis"""
         notes = []
         
-        # Get risk level for context
-        risk_level = self._calculate_risk_level(agent_results, llm_analysis)
+        # Get risk level for context (callers that already aggregated it pass it in)
+        if risk_level is None:
+            risk_level = self._calculate_risk_level(agent_results, llm_analysis)
         
         # Add risk-specific base note
         if risk_level == "high":
@@ -613,7 +729,8 @@ class UnifiedComplianceAnalyzer:
             notes.append("📋 General: Review feature against applicable privacy regulations")
             notes.append("🔍 Assessment: Consider data flow and user impact analysis")
         
-        return notes
+        # Agents can repeat the same recommendation - drop repeats, keep order
+        return list(dict.fromkeys(notes))
     
     def _calculate_confidence(self, agent_results: Dict, llm_analysis: Dict) -> float:
         """Calculate overall confidence score based on analysis quality and consistency"""
@@ -686,7 +803,7 @@ class UnifiedComplianceAnalyzer:
         
         # Calculate weighted average with emphasis on agent consensus and LLM confidence
         if confidence_factors:
-            weights = [0.3, 0.3, 0.2, 0.2][:len(confidence_factors)]  # Prioritize agent and LLM
+            weights = _CONFIDENCE_WEIGHTS[:len(confidence_factors)]  # Prioritize agent and LLM
             weighted_confidence = sum(cf * w for cf, w in zip(confidence_factors, weights))
             final_confidence = weighted_confidence / sum(weights)
             
@@ -701,10 +818,7 @@ class UnifiedComplianceAnalyzer:
                 base_confidence *= 0.75  # Much lower for failed analysis with no regulations
             
             # Add small random variation to prevent identical scores
-            import hashlib
-            feature_hash = hashlib.md5(agent_results.get('feature_name', 'unknown').encode()).hexdigest()
-            variation = (int(feature_hash[:2], 16) % 10) / 100  # 0.00 to 0.09 variation
-            base_confidence += variation - 0.05  # +/- 0.05 variation
+            base_confidence += _confidence_variation(agent_results.get('feature_name', 'unknown'))
             
             return round(max(0.2, min(0.95, base_confidence)), 2)
         
@@ -716,12 +830,7 @@ class UnifiedComplianceAnalyzer:
         base_confidence = 0.4  # Lower base for fallback
         
         # Well-known feature patterns get higher confidence
-        known_patterns = [
-            'age verification', 'content moderation', 'location', 'recommendation',
-            'authentication', 'privacy', 'security', 'compliance'
-        ]
-        
-        if any(pattern in feature_name for pattern in known_patterns):
+        if any(pattern in feature_name for pattern in _KNOWN_FEATURE_PATTERNS):
             base_confidence += 0.2
         
         # Agent consensus helps confidence
@@ -736,3 +845,19 @@ class UnifiedComplianceAnalyzer:
             base_confidence += 0.05
         
         return min(base_confidence, 0.8)  # Cap fallback confidence
+
+@functools.cache
+def get_shared_analyzer() -> UnifiedComplianceAnalyzer:
+    """Process-wide analyzer, built on first use - the vector store, legal corpus,
+    embedding model and agents are loaded once and shared by every service"""
+    return UnifiedComplianceAnalyzer()
+
+def is_shared_analyzer(analyzer: UnifiedComplianceAnalyzer) -> bool:
+    """Whether analyzer is the process-wide one (without building it if it doesn't exist yet)"""
+    return get_shared_analyzer.cache_info().currsize > 0 and analyzer is get_shared_analyzer()
+
+@atexit.register
+def close_shared_analyzer():
+    """Release the shared analyzer's HTTP session and workers - other services may use them until exit"""
+    if get_shared_analyzer.cache_info().currsize > 0:
+        get_shared_analyzer().llm_client.close()
@@ -1,13 +1,18 @@
 import pickle
 import hashlib
+import threading
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any
 
+from utils.relevance import extract_locations
+
 class ComplianceCache:
     def __init__(self, cache_file="compliance_cache.pkl", expiry_days=30):
         self.cache_file = cache_file
         self.expiry_days = expiry_days
         self.cache = self.load_cache()
+        # Writers may run in worker threads - never pickle the dict while another thread mutates it
+        self._lock = threading.RLock()
     
     def load_cache(self) -> Dict:
         """Load cache from file"""
@@ -19,7 +24,7 @@ class ComplianceCache:
     
     def save_cache(self):
         """Save cache to file"""
-        with open(self.cache_file, 'wb') as f:
+        with self._lock, open(self.cache_file, 'wb') as f:
             pickle.dump(self.cache, f)
     
     def _generate_hash(self, text: str) -> str:
@@ -39,7 +44,8 @@ class ComplianceCache:
                 return cached_item['result']
             else:
                 # Remove expired entry
-                del self.cache[cache_key]
+                with self._lock:
+                    self.cache.pop(cache_key, None)
         
         return None
     
@@ -49,24 +55,114 @@ class ComplianceCache:
         statute_hash = self._generate_hash(statute_content)
         cache_key = f"{feature_hash}_{statute_hash}"
         
-        self.cache[cache_key] = {
-            'result': result,
-            'timestamp': datetime.now()
-        }
-        self.save_cache()
+        with self._lock:
+            self.cache[cache_key] = {
+                'result': result,
+                'timestamp': datetime.now()
+            }
+            self.save_cache()
     
     def clear_expired(self):
         """Remove all expired entries"""
         current_time = datetime.now()
-        expired_keys = []
-        
-        for key, item in self.cache.items():
-            if current_time - item['timestamp'] > timedelta(days=self.expiry_days):
-                expired_keys.append(key)
         
-        for key in expired_keys:
-            del self.cache[key]
-        
-        if expired_keys:
-            self.save_cache()
+        # Scan under the lock too - a concurrent set() would otherwise resize the dict mid-iteration
+        with self._lock:
+            expired_keys = [
+                key for key, item in self.cache.items()
+                if current_time - item['timestamp'] > timedelta(days=self.expiry_days)
+            ]
+            
+            for key in expired_keys:
+                self.cache.pop(key, None)
+            
+            if expired_keys:
+                self.save_cache()
             print(f"Cleared {len(expired_keys)} expired cache entries")
+
+
+class SemanticCache:
+    """LLM response cache matched by embedding similarity instead of exact text.
+
+    Lives in its own collection of the ChromaDB store, so rephrased or lightly
+    edited feature descriptions can reuse an earlier response. Entries are scoped
+    to the model and prompt version that produced them, expire after expiry_days,
+    and only match prompts naming the same locations - a similar feature in another
+    jurisdiction must not inherit the first one's regulations. Disabled when the
+    vector store isn't ChromaDB-backed.
+    """
+    
+    def __init__(self, vector_store, threshold: float = 0.92, model: str = "", prompt_version: str = "",
+                 expiry_days: float = 1, collection_name: str = "llm_semantic_cache"):
+        self.threshold = threshold
+        self.model = model
+        self.prompt_version = prompt_version
+        self.expiry_days = expiry_days
+        self.collection = None
+        
+        client = getattr(vector_store, 'client', None)
+        if client is None:
+            print("ℹ️ Semantic LLM cache disabled (requires ChromaDB vector store)")
+            return
+        try:
+            # Cosine space so distance = 1 - similarity
+            self.collection = client.get_or_create_collection(
+                name=collection_name,
+                embedding_function=vector_store.embedding_function,
+                metadata={"hnsw:space": "cosine"}
+            )
+        except Exception as e:
+            print(f"⚠️ Semantic LLM cache unavailable: {e}")
+    
+    @property
+    def enabled(self) -> bool:
+        return self.collection is not None
+    
+    @staticmethod
+    def _locations_key(prompt: str) -> str:
+        return "|".join(sorted(extract_locations(prompt)))
+    
+    def get(self, prompt: str) -> Optional[str]:
+        """Return the stored response of the most similar earlier prompt, if close enough"""
+        if not self.enabled:
+            return None
+        try:
+            if self.collection.count() == 0:
+                return None
+            cutoff = (datetime.now() - timedelta(days=self.expiry_days)).timestamp()
+            # Only entries from this model/prompt version, still fresh, naming exactly the same locations
+            results = self.collection.query(
+                query_texts=[prompt],
+                n_results=1,
+                where={"$and": [
+                    {"model": self.model},
+                    {"prompt_version": self.prompt_version},
+                    {"locations": self._locations_key(prompt)},
+                    {"created_at": {"$gte": cutoff}}
+                ]}
+            )
+            distances = results['distances'][0]
+            if distances and 1.0 - distances[0] >= self.threshold:
+                return results['metadatas'][0][0].get('response')
+        except Exception as e:
+            print(f"⚠️ Semantic cache lookup failed: {e}")
+        return None
+    
+    def put(self, prompt: str, response: str):
+        """Store a response under the embedding of its prompt"""
+        if not self.enabled:
+            return
+        try:
+            self.collection.upsert(
+                ids=[hashlib.sha256(f"{self.model}|{self.prompt_version}|{prompt}".encode('utf-8')).hexdigest()],
+                documents=[prompt],
+                metadatas=[{
+                    "response": response,
+                    "model": self.model,
+                    "prompt_version": self.prompt_version,
+                    "locations": self._locations_key(prompt),
+                    "created_at": datetime.now().timestamp()
+                }]
+            )
+        except Exception as e:
+            print(f"⚠️ Semantic cache store failed: {e}")
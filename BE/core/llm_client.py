@@ -1,10 +1,13 @@
 """
 LLM Client for OpenRouter API integration
 """
-import requests
 import asyncio
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any
 from config import ComplianceConfig
+from core.cache import ComplianceCache
+from utils.concurrency import run_blocking
 
 class LLMClient:
     """Client for LLM API calls"""
@@ -13,6 +16,74 @@ class LLMClient:
         self.api_key = ComplianceConfig.OPENROUTER_API_KEY
         self.model = ComplianceConfig.OPENROUTER_MODEL
         self.base_url = "https://openrouter.ai/api/v1/chat/completions"
+        # Pooled HTTP session shared by every caller of this client (agents + direct analysis)
+        self._session = None
+        # Dedicated threads for blocking HTTP calls, so LLM traffic neither queues behind
+        # nor starves the loop's default executor (used by offloaded vector searches)
+        self._executor = None
+        # Persistent cache of successful responses keyed by (prompt, model)
+        self._response_cache = ComplianceCache(
+            cache_file="llm_response_cache.pkl", expiry_days=ComplianceConfig.LLM_CACHE_EXPIRY_DAYS
+        ) if ComplianceConfig.ENABLE_CACHE else None
+        self.cache_hits = 0
+        self.cache_misses = 0
+        # Identical prompts already on the wire, keyed by (event loop, prompt hash)
+        self._inflight = {}
+    
+    def _get_session(self):
+        """Lazily create the shared requests session so TCP/TLS connections are reused"""
+        if self._session is None:
+            import requests
+            from urllib3.util.retry import Retry
+            self._session = requests.Session()
+            # Keep one pooled connection per HTTP worker thread, and retry transient
+            # upstream errors / rate limits with backoff (POST is not retried by default)
+            retry = Retry(
+                total=2,
+                backoff_factor=0.3,
+                status_forcelist=[429, 502, 503, 504],
+                allowed_methods=frozenset({"POST"}),
+                raise_on_status=False
+            )
+            adapter = requests.adapters.HTTPAdapter(
+                pool_maxsize=ComplianceConfig.LLM_MAX_CONCURRENCY, max_retries=retry
+            )
+            self._session.mount("https://", adapter)
+        return self._session
+    
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Lazily create the HTTP worker pool, sized for the configured in-flight request limit"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=ComplianceConfig.LLM_MAX_CONCURRENCY, thread_name_prefix="openrouter"
+            )
+        return self._executor
+    
+    def warmup(self, timeout: int = 5):
+        """Open the pooled HTTPS connection ahead of the first analysis.
+
+        Hits the free model listing endpoint rather than a completion, so no
+        tokens are spent; failures are ignored since the real call will retry.
+        """
+        if not self.api_key:
+            return
+        try:
+            self._get_session().get(
+                "https://openrouter.ai/api/v1/models",
+                headers={"Authorization": f"Bearer {self.api_key}"},
+                timeout=timeout
+            )
+        except Exception as e:
+            print(f"⚠️ OpenRouter warmup failed: {e}")
+    
+    def close(self):
+        """Close the pooled HTTP session and worker threads"""
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
     
     async def analyze(self, prompt: str, timeout: int = 30, static_analysis: Dict = None, retrieved_docs: Dict = None) -> str:
         """
@@ -120,19 +191,50 @@ Focus on practical, actionable insights that developers can implement immediatel
             ],
             "max_tokens": 2000,
             "temperature": 0.3,  # Lower temperature for more consistent analysis
-            "top_p": 0.9
+            "top_p": 0.9,
+            # JSON mode: the prompt already asks for a JSON object, so have the provider enforce it
+            "response_format": {"type": "json_object"}
         }
         
+        cache = self._response_cache
+        if cache is not None:
+            cached = cache.get_cached_result(enhanced_prompt, self.model)
+            if cached is not None:
+                self.cache_hits += 1
+                print(f"♻️ LLM response cache hit ({self.cache_hits} hits / {self.cache_misses} misses)")
+                return cached
+            self.cache_misses += 1
+        
+        # Single-flight: concurrent callers with the same prompt share one request
+        loop = asyncio.get_running_loop()
+        key = (loop, hashlib.sha256(f"{self.model}\n{enhanced_prompt}".encode('utf-8')).hexdigest())
+        task = self._inflight.get(key)
+        if task is None:
+            task = loop.create_task(self._post(headers, payload, timeout, enhanced_prompt, retrieved_docs))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            print("🔗 Joining in-flight OpenRouter request for identical prompt")
+        # Shielded so one caller being cancelled doesn't cancel the request for the others
+        return await asyncio.shield(task)
+    
+    async def _post(self, headers: Dict, payload: Dict, timeout: int, enhanced_prompt: str, retrieved_docs: Dict = None) -> str:
+        """Send one chat completion request and cache a successful response"""
+        # Deferred so mock-mode runs never pay for importing requests
+        import requests
+        
+        cache = self._response_cache
         try:
             print(f"🌐 Calling OpenRouter API...")
             print(f"   Model: {self.model}")
             print(f"   RAG Context: {'✅ Documents provided' if retrieved_docs else '⚠️ Using fallback context'}")
             
-            # Run in thread pool to avoid blocking
-            loop = asyncio.get_event_loop()
+            # Run in the dedicated HTTP pool to avoid blocking
+            session = self._get_session()
+            loop = asyncio.get_running_loop()
             response = await loop.run_in_executor(
-                None, 
-                lambda: requests.post(self.base_url, headers=headers, json=payload, timeout=timeout)
+                self._get_executor(),
+                lambda: session.post(self.base_url, headers=headers, json=payload, timeout=timeout)
             )
             
             response.raise_for_status()
@@ -141,6 +243,9 @@ Focus on practical, actionable insights that developers can implement immediatel
             if 'choices' in data and len(data['choices']) > 0:
                 content = data['choices'][0]['message']['content']
                 print(f"✅ OpenRouter API response received: {len(content)} characters")
+                if cache is not None:
+                    # Persisting rewrites the whole pickle - keep that file I/O off the event loop
+                    await run_blocking(cache.cache_result, enhanced_prompt, self.model, content)
                 return content
             else:
                 return f"Error: No choices in response: {data}"
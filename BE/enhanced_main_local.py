@@ -7,24 +7,37 @@ Based on enhanced_main.py but using BE services and current code architecture
 import asyncio
 import json
 import csv
+import hashlib
+import io
 import os
+import statistics
 import sys
-from datetime import datetime
+import time
+from collections import Counter, OrderedDict
+from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, fields
 
 # Add BE modules to path
-sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+current_dir = os.path.dirname(os.path.abspath(__file__))
+if current_dir not in sys.path:
+    sys.path.insert(0, current_dir)
 
-from core.analyzer import UnifiedComplianceAnalyzer
+from core.analyzer import get_shared_analyzer
+from core.cache import ComplianceCache
 from services.compliance_service import ComplianceService
-from services.jargon_service import JargonService
-from services.vector_service import get_vector_store
 from config import ComplianceConfig
+from utils.concurrency import run, run_blocking
 
-@dataclass
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+@dataclass(slots=True)
 class EnhancedComplianceResult:
-    """Enhanced result structure matching enhanced_main format"""
+    """Enhanced result structure matching enhanced_main format (slotted - one per analyzed feature)"""
     feature_id: str
     feature_name: str
     analysis_type: str
@@ -39,15 +52,56 @@ class EnhancedComplianceResult:
     rag_analysis: Optional[Dict] = None
     timestamp: str = ""
 
+# Column order of the CSV export
+_CSV_FIELDNAMES = (
+    "feature_id", "feature_name", "needs_compliance_logic", "confidence",
+    "risk_level", "action_required", "analysis_type", "be_service_used",
+    "rag_enhanced", "rag_documents_found", "applicable_regulations_count",
+    "timestamp"
+)
+
+# Values used when the compliance service omits a field. The list fields default to
+# empty tuples: the same default object is shared by every result, so it must be immutable
+_RESULT_DEFAULTS = {
+    'needs_compliance_logic': False,
+    'confidence': 0.0,
+    'risk_level': 'low',
+    'action_required': 'NO_ACTION',
+    'applicable_regulations': (),
+    'implementation_notes': (),
+    'agent_results': None,
+    'llm_analysis': None
+}
+
+# Fixed tail appended to every RAG search query
+_RAG_QUERY_SUFFIX = "TikTok social media compliance regulatory requirements"
+
+# Field names for the shallow export projection in _format_enhanced_result
+_RESULT_FIELDS = tuple(f.name for f in fields(EnhancedComplianceResult))
+
 class EnhancedBEComplianceSystem:
     """Enhanced compliance system using BE services for local testing"""
     
+    # Max distinct RAG queries whose retrieved documents are kept in memory
+    RAG_CACHE_SIZE = 1024
+    
     def __init__(self):
         self.config = ComplianceConfig()
-        self.analyzer = UnifiedComplianceAnalyzer()
-        self.compliance_service = ComplianceService()
-        self.jargon_service = JargonService()
+        self.analyzer = get_shared_analyzer()
+        # Share one analyzer (and so one LLM client/HTTP session) between the service and this system
+        self.compliance_service = ComplianceService(analyzer=self.analyzer)
+        self.jargon_service = self.analyzer.jargon_service
         self.analysis_results = []
+        # Bounds how many features hit the LLM/vector backends at once
+        self._sem = asyncio.Semaphore(self.config.MAX_PARALLEL_ANALYSES)
+        # LRU of retrieved documents keyed by blake2b(query) - repeated queries skip embedding + search
+        self._rag_cache = OrderedDict()
+        # CSV columns of the latest run, tied to the detailed_results list they were collected for
+        self._csv_columns = None
+        # Persistent cache of whole-pipeline service results - unchanged features skip LLM + agents on re-runs
+        self._pipeline_cache = ComplianceCache(
+            cache_file="pipeline_cache.pkl", expiry_days=self.config.CACHE_EXPIRY_DAYS
+        ) if self.config.ENABLE_CACHE else None
         
         # Output configuration
         self.output_dir = "compliance_outputs_be"
@@ -57,15 +111,22 @@ class EnhancedBEComplianceSystem:
         print(f"🔧 Using BE services architecture")
         print(f"📚 RAG: Forced enabled with vector store")
     
+    def close(self):
+        """Release service resources (the shared analyzer's HTTP session is closed at process exit)"""
+        self.compliance_service.close()
+    
     def ensure_output_directory(self):
         """Ensure output directory exists"""
-        if not os.path.exists(self.output_dir):
-            os.makedirs(self.output_dir)
+        os.makedirs(self.output_dir, exist_ok=True)
     
     async def analyze_feature_list(self, features: List[Dict], include_rag_analysis: bool = True) -> Dict:
         """Analyze features using BE services with enhanced format"""
         print(f"\n📋 Starting enhanced BE analysis of {len(features)} features...")
         
+        # One wall-clock read per run; per-feature timestamps are monotonic offsets from it
+        t0_wall = datetime.now()
+        t0_mono = time.monotonic_ns()
+        
         results = {
             "analysis_summary": {
                 "total_features": len(features),
@@ -73,7 +134,7 @@ class EnhancedBEComplianceSystem:
                 "high_risk_features": 0,
                 "human_review_needed": 0,
                 "rag_enabled": True,
-                "analysis_timestamp": datetime.now().isoformat(),
+                "analysis_timestamp": t0_wall.isoformat(),
                 "system_version": "Enhanced BE v1.0",
                 "backend_architecture": "Flask + Multi-Agent + Forced RAG"
             },
@@ -88,151 +149,312 @@ class EnhancedBEComplianceSystem:
             }
         }
         
-        for i, feature in enumerate(features, 1):
-            print(f"\n📊 Analyzing feature {i}/{len(features)}: {feature.get('feature_name', 'Unknown')}")
+        # Longest-first dispatch: the slowest features start earliest so the
+        # task group below isn't held up by a straggler that was queued last
+        n = len(features)
+        order = sorted(
+            range(n),
+            key=lambda idx: -len(features[idx].get('code', '')) - len(features[idx].get('description', ''))
+        )
+        
+        # Per-feature analyze_feature service time (semaphore wait and pipeline cache hits excluded),
+        # for the latency line in the summary
+        durations_ns: List[int] = []
+        
+        # Batched RAG retrieval and the per-feature compliance analyses are independent -
+        # run them side by side in one task group instead of retrieving first
+        async with asyncio.TaskGroup() as tg:
+            if include_rag_analysis:
+                print(f"  📚 Performing enhanced RAG analysis for {n} features...")
+                rag_task = tg.create_task(self._batch_rag(features))
+            else:
+                rag_task = None
+            # _analyze_one turns per-feature failures into error results, so one bad
+            # feature never cancels its siblings
+            tasks = [
+                tg.create_task(self._analyze_one(idx + 1, features[idx], n, t0_mono, durations_ns))
+                for idx in order
+            ]
+        rag_results = rag_task.result() if rag_task else [None] * n
+        
+        # Reindex back to input order, writing results straight into pre-sized slots
+        per_feature = [None] * n
+        totals = Counter()
+        detailed_results = results["detailed_results"] = [None] * n
+        base = len(self.analysis_results)
+        self.analysis_results.extend([None] * n)
+        for idx, task in zip(order, tasks):
+            enhanced_result, service_result, tags, offset_ns = task.result()
+            totals.update(tags)
+            # Failed analyses keep no RAG context, as before
+            rag_analysis = rag_results[idx] if service_result is not None else None
+            enhanced_result.rag_analysis = rag_analysis
+            enhanced_result.timestamp = (t0_wall + timedelta(microseconds=offset_ns // 1000)).isoformat()
+            self.analysis_results[base + idx] = enhanced_result
+            detailed_results[idx] = self._format_enhanced_result(enhanced_result)
+            per_feature[idx] = (enhanced_result, service_result, rag_analysis, offset_ns)
+        
+        summary = results["analysis_summary"]
+        summary["features_requiring_compliance"] = totals["compliance"]
+        summary["high_risk_features"] = totals["high"]
+        summary["human_review_needed"] = totals["review"]
+        rag_perf = results["rag_performance"]
+        audit_append = results["audit_trail"].append
+        # CSV export columns (structure-of-arrays), filled in input order alongside the counters
+        columns = {name: [] for name in _CSV_FIELDNAMES}
+        self._csv_columns = (detailed_results, columns)
+        analysis_start = summary["analysis_timestamp"]
+        for enhanced_result, service_result, rag_analysis, offset_ns in per_feature:
+            columns["feature_id"].append(enhanced_result.feature_id)
+            columns["feature_name"].append(enhanced_result.feature_name)
+            columns["needs_compliance_logic"].append(enhanced_result.needs_compliance_logic)
+            columns["confidence"].append(enhanced_result.confidence)
+            columns["risk_level"].append(enhanced_result.risk_level)
+            columns["action_required"].append(enhanced_result.action_required)
+            columns["analysis_type"].append(enhanced_result.analysis_type)
+            columns["be_service_used"].append(True)
+            columns["rag_enhanced"].append(rag_analysis is not None)
+            columns["rag_documents_found"].append(rag_analysis.get("documents_retrieved", 0) if rag_analysis else 0)
+            columns["applicable_regulations_count"].append(len(enhanced_result.applicable_regulations))
+            columns["timestamp"].append(enhanced_result.timestamp)
             
-            try:
-                # Use BE compliance service for analysis
-                feature_data = {
-                    'featureName': feature.get('feature_name', 'Unknown'),
-                    'description': feature.get('description', ''),
-                    'id': feature.get('id', f'feat_{i}')
-                }
-                
-                print(f"  🔧 Using BE ComplianceService...")
-                service_result = await self.compliance_service.analyze_feature(feature_data)
-                
-                # Track RAG performance from service result
-                if service_result.get('rag_summary'):
-                    rag_summary = service_result['rag_summary']
-                    results["rag_performance"]["documents_retrieved"] += rag_summary.get("documents_found", 0)
-                    if "SimpleFallbackStore" in str(service_result.get('llm_analysis', {}).get('raw_response', '')):
-                        results["rag_performance"]["fallback_used"] = True
-                        results["rag_performance"]["vector_store_type"] = "SimpleFallbackStore"
-                    elif service_result.get('rag_enhanced'):
-                        results["rag_performance"]["vector_store_type"] = "ChromaDB"
-                
-                # Enhanced RAG analysis if requested
-                rag_analysis = None
-                if include_rag_analysis:
-                    print(f"  📚 Performing enhanced RAG analysis...")
-                    rag_analysis = await self._perform_enhanced_rag_analysis(feature)
-                    if rag_analysis:
-                        results["rag_performance"]["documents_retrieved"] += rag_analysis.get("documents_retrieved", 0)
-                
-                # Create enhanced result structure
-                enhanced_result = EnhancedComplianceResult(
-                    feature_id=feature.get('id', f'feat_{i}'),
-                    feature_name=feature.get('feature_name', 'Unknown'),
-                    analysis_type="enhanced_be_service",
-                    needs_compliance_logic=service_result.get('needs_compliance_logic', False),
-                    confidence=service_result.get('confidence', 0.0),
-                    risk_level=service_result.get('risk_level', 'low'),
-                    action_required=service_result.get('action_required', 'NO_ACTION'),
-                    applicable_regulations=service_result.get('applicable_regulations', []),
-                    implementation_notes=service_result.get('implementation_notes', []),
-                    agent_results=service_result.get('agent_results'),
-                    llm_analysis=service_result.get('llm_analysis'),
-                    rag_analysis=rag_analysis,
-                    timestamp=datetime.now().isoformat()
-                )
-                
-                self.analysis_results.append(enhanced_result)
-                results["detailed_results"].append(self._format_enhanced_result(enhanced_result))
-                
-                # Update summary statistics
-                if enhanced_result.needs_compliance_logic:
-                    results["analysis_summary"]["features_requiring_compliance"] += 1
-                
-                if enhanced_result.risk_level == "high":
-                    results["analysis_summary"]["high_risk_features"] += 1
-                
-                if service_result.get('human_review_needed', False):
-                    results["analysis_summary"]["human_review_needed"] += 1
-                
-                # Add to audit trail
-                results["audit_trail"].append({
-                    "feature_id": enhanced_result.feature_id,
-                    "timestamp": enhanced_result.timestamp,
-                    "service_used": "BE ComplianceService",
-                    "rag_used": rag_analysis is not None,
-                    "confidence": enhanced_result.confidence,
-                    "action": enhanced_result.action_required
-                })
-                
-                print(f"  ✅ BE Analysis complete - Risk: {enhanced_result.risk_level}, Action: {enhanced_result.action_required}")
-                
-            except Exception as e:
-                print(f"  ❌ BE Analysis failed for feature {i}: {e}")
-                # Add error result
-                error_result = EnhancedComplianceResult(
-                    feature_id=feature.get('id', f'feat_{i}'),
-                    feature_name=feature.get('feature_name', 'Unknown'),
-                    analysis_type="error",
-                    needs_compliance_logic=False,
-                    confidence=0.0,
-                    risk_level="unknown",
-                    action_required="HUMAN_REVIEW",
-                    applicable_regulations=[],
-                    implementation_notes=[f"BE Analysis failed: {e}"],
-                    timestamp=datetime.now().isoformat()
-                )
-                
-                self.analysis_results.append(error_result)
-                results["detailed_results"].append(self._format_enhanced_result(error_result))
-                results["analysis_summary"]["human_review_needed"] += 1
+            if service_result is None:
+                continue
+            
+            # Track RAG performance from service result
+            rag_summary = service_result.get('rag_summary')
+            if rag_summary:
+                rag_perf["documents_retrieved"] += rag_summary.get("documents_found", 0)
+            
+            # The fallback store also returns documents, so the store type decides vector vs keyword search
+            store_type = service_result.get('vector_store_type')
+            if store_type is None:
+                # Results from older services don't carry the store type - sniff the raw response as before
+                if "SimpleFallbackStore" in str(service_result.get('llm_analysis', {}).get('raw_response', '')):
+                    store_type = "SimpleFallbackStore"
+            if store_type == "SimpleFallbackStore":
+                rag_perf["fallback_used"] = True
+                rag_perf["vector_store_type"] = store_type
+            elif store_type == "VectorService":
+                rag_perf["vector_store_type"] = "ChromaDB"
+            elif store_type:
+                rag_perf["vector_store_type"] = store_type
+            
+            if rag_analysis:
+                rag_perf["documents_retrieved"] += rag_analysis.get("documents_retrieved", 0)
+            
+            # Add to audit trail
+            # offset_ns (monotonic, from the run anchor) orders entries exactly; timestamp is for humans
+            audit_append({
+                "feature_id": enhanced_result.feature_id,
+                "timestamp": enhanced_result.timestamp,
+                "anchor": analysis_start,
+                "offset_ns": offset_ns,
+                "service_used": "BE ComplianceService",
+                "rag_used": rag_analysis is not None,
+                "confidence": enhanced_result.confidence,
+                "action": enhanced_result.action_required
+            })
         
         # Calculate RAG performance metrics
-        total_features = results["analysis_summary"]["total_features"]
-        docs_retrieved = results["rag_performance"]["documents_retrieved"]
+        docs_retrieved = rag_perf["documents_retrieved"]
         
         if docs_retrieved > 0:
             # Calculate average relevance based on fallback vs real vector search
-            if results["rag_performance"]["fallback_used"]:
-                results["rag_performance"]["avg_relevance"] = 0.60  # Lower for keyword fallback
+            if rag_perf["fallback_used"]:
+                rag_perf["avg_relevance"] = 0.60  # Lower for keyword fallback
             else:
-                results["rag_performance"]["avg_relevance"] = 0.85  # Higher for vector search
+                rag_perf["avg_relevance"] = 0.85  # Higher for vector search
         else:
             # If no documents retrieved, we're definitely using fallback
-            results["rag_performance"]["fallback_used"] = True
-            results["rag_performance"]["vector_store_type"] = "SimpleFallbackStore"
+            rag_perf["fallback_used"] = True
+            rag_perf["vector_store_type"] = "SimpleFallbackStore"
             # Assume 5 documents per feature analysis (as seen in console output)
-            results["rag_performance"]["documents_retrieved"] = total_features * 5
-            results["rag_performance"]["avg_relevance"] = 0.60
+            rag_perf["documents_retrieved"] = n * 5
+            rag_perf["avg_relevance"] = 0.60
         
         # Generate enhanced recommendations
         results["recommendations"] = self._generate_enhanced_recommendations(results)
         
         print(f"\n🎉 Enhanced BE Analysis complete! Summary:")
-        print(f"   📊 Total features: {results['analysis_summary']['total_features']}")
-        print(f"   ⚖️ Compliance required: {results['analysis_summary']['features_requiring_compliance']}")
-        print(f"   🚨 High risk: {results['analysis_summary']['high_risk_features']}")
-        print(f"   👥 Human review needed: {results['analysis_summary']['human_review_needed']}")
-        print(f"   📚 RAG documents retrieved: {results['rag_performance']['documents_retrieved']}")
+        print(f"   📊 Total features: {summary['total_features']}")
+        print(f"   ⚖️ Compliance required: {summary['features_requiring_compliance']}")
+        print(f"   🚨 High risk: {summary['high_risk_features']}")
+        print(f"   👥 Human review needed: {summary['human_review_needed']}")
+        print(f"   📚 RAG documents retrieved: {rag_perf['documents_retrieved']}")
+        if durations_ns:
+            ms = sorted(d / 1e6 for d in durations_ns)
+            p95 = ms[min(len(ms) - 1, int(len(ms) * 0.95))]
+            print(f"   ⏱ analyze_feature ms - min {ms[0]:.2f}, median {statistics.median(ms):.2f}, p95 {p95:.2f}")
+        if totals["cache_hit"]:
+            print(f"   ♻️ Pipeline cache hits: {totals['cache_hit']} (not in the latency line)")
         
         return results
     
-    async def _perform_enhanced_rag_analysis(self, feature: Dict) -> Optional[Dict]:
-        """Perform enhanced RAG analysis using vector store directly"""
+    async def _analyze_one(self, i: int, feature: Dict, total: int, t0_mono: int,
+                           durations_ns: Optional[List[int]] = None) -> tuple:
+        """Analyze a single feature, returning (result, service_result, summary tags, offset_ns)"""
+        feature_name = feature.get('feature_name', 'Unknown')
+        feature_id = feature.get('id', f'feat_{i}')
+        print(f"\n📊 Analyzing feature {i}/{total}: {feature_name}")
+        
         try:
-            vector_store = get_vector_store()
+            # Use BE compliance service for analysis
+            feature_data = {
+                'featureName': feature_name,
+                'description': feature.get('description', ''),
+                'id': feature_id
+            }
+            
+            service_result, elapsed_ns = await self._cached_analyze(feature_data)
+            if elapsed_ns is not None:
+                if durations_ns is not None:
+                    durations_ns.append(elapsed_ns)
+                print(f"  ⏱ analyze_feature: {elapsed_ns / 1e6:.2f} ms")
             
-            # Enhanced search query
-            search_query = f"""
-            Feature: {feature.get('feature_name', '')}
-            Description: {feature.get('description', '')}
-            TikTok social media compliance regulatory requirements
-            """
+            # Create enhanced result structure - one merge fills in anything the service left out
+            merged = {**_RESULT_DEFAULTS, **service_result}
+            enhanced_result = EnhancedComplianceResult(
+                feature_id=feature_id,
+                feature_name=feature_name,
+                analysis_type="enhanced_be_service",
+                needs_compliance_logic=merged['needs_compliance_logic'],
+                confidence=merged['confidence'],
+                risk_level=merged['risk_level'],
+                action_required=merged['action_required'],
+                applicable_regulations=merged['applicable_regulations'],
+                implementation_notes=merged['implementation_notes'],
+                agent_results=merged['agent_results'],
+                llm_analysis=merged['llm_analysis']
+            )
             
-            retrieved_docs = vector_store.search_relevant_statutes(search_query.strip(), n_results=5)
+            # Summary tags for this feature, merged into the run totals after the task group
+            tags = Counter()
+            tags["compliance"] += enhanced_result.needs_compliance_logic
+            tags["high"] += enhanced_result.risk_level == "high"
+            tags["review"] += bool(service_result.get('human_review_needed', False))
+            tags["cache_hit"] += elapsed_ns is None
             
+            print(f"  ✅ BE Analysis complete - Risk: {enhanced_result.risk_level}, Action: {enhanced_result.action_required}")
+            return enhanced_result, service_result, tags, time.monotonic_ns() - t0_mono
+            
+        except Exception as e:
+            print(f"  ❌ BE Analysis failed for feature {i}: {e}")
+            # Analysis failed - error result always goes to human review
+            return self._error_result(i, feature, e), None, Counter(review=1), time.monotonic_ns() - t0_mono
+    
+    def _pipeline_cache_tag(self) -> str:
+        """Everything besides the feature that determines the service result"""
+        # Mock responses (no API key) must never be served once a real key is configured
+        mode = "live" if self.config.OPENROUTER_API_KEY else "mock"
+        return f"{self.config.OPENROUTER_MODEL}|{self.config.PROMPT_VERSION}|{mode}"
+    
+    async def _cached_analyze(self, feature_data: Dict) -> tuple:
+        """
+        Run the compliance service, replaying stored results for features seen before
+        
+        Returns:
+            (service_result, service time in ns - None for a pipeline cache hit)
+        """
+        cache = self._pipeline_cache
+        if cache is not None:
+            feature_key = json.dumps(feature_data, sort_keys=True, ensure_ascii=False)
+            cached = cache.get_cached_result(feature_key, self._pipeline_cache_tag())
+            if cached is not None:
+                print(f"  ♻️ Pipeline cache hit - skipping BE ComplianceService")
+                return cached, None
+        
+        async with self._sem:
+            # Timed once a slot is held, so queueing behind MAX_PARALLEL_ANALYSES isn't counted
+            t0 = time.perf_counter_ns()
+            print(f"  🔧 Using BE ComplianceService...")
+            service_result = await self.compliance_service.analyze_feature(feature_data)
+            elapsed_ns = time.perf_counter_ns() - t0
+        
+        # Degraded results (LLM fallback/error) would otherwise be replayed for CACHE_EXPIRY_DAYS
+        if cache is not None and self.compliance_service.is_cacheable(service_result):
+            # Persisting rewrites the whole pickle - keep that file I/O off the event loop
+            await run_blocking(cache.cache_result, feature_key, self._pipeline_cache_tag(), service_result)
+        return service_result, elapsed_ns
+    
+    def _error_result(self, i: int, feature: Dict, error: BaseException) -> EnhancedComplianceResult:
+        """Build the result recorded for a feature whose analysis failed"""
+        return EnhancedComplianceResult(
+            feature_id=feature.get('id', f'feat_{i}'),
+            feature_name=feature.get('feature_name', 'Unknown'),
+            analysis_type="error",
+            needs_compliance_logic=False,
+            confidence=0.0,
+            risk_level="unknown",
+            action_required="HUMAN_REVIEW",
+            applicable_regulations=[],
+            implementation_notes=[f"BE Analysis failed: {error}"]
+        )
+    
+    async def _perform_enhanced_rag_analysis(self, feature: Dict) -> Optional[Dict]:
+        """Perform enhanced RAG analysis using vector store directly"""
+        return (await self._batch_rag([feature]))[0]
+    
+    async def _batch_rag(self, features: List[Dict]) -> List[Optional[Dict]]:
+        """Enhanced RAG analysis for many features with one batched vector store query"""
+        search_queries = [self._build_rag_query(feature) for feature in features]
+        cache_keys = [hashlib.blake2b(query.encode(), digest_size=16).digest() for query in search_queries]
+        
+        # Only queries not seen before go to the vector store (duplicates within the batch once)
+        missing = {}
+        for key, query in zip(cache_keys, search_queries):
+            if key in self._rag_cache:
+                self._rag_cache.move_to_end(key)
+            else:
+                missing.setdefault(key, query)
+        
+        if missing:
+            try:
+                # Reuse the analyzer's store - its legal corpus is already loaded (or persisted)
+                vector_store = self.analyzer.vector_service
+                
+                # Vector search is blocking - keep it off the event loop
+                batch_docs = await run_blocking(
+                    vector_store.batch_search_relevant_statutes, list(missing.values()), n_results=5
+                )
+            except Exception as e:
+                print(f"    ⚠️ Enhanced RAG analysis failed: {e}")
+                return [None] * len(features)
+            
+            fetched = dict(zip(missing, batch_docs))
+            for key, retrieved_docs in fetched.items():
+                # Stores report query errors as empty rows rather than raising - don't pin those
+                if retrieved_docs and retrieved_docs.get('documents') and retrieved_docs['documents'][0]:
+                    self._rag_cache[key] = retrieved_docs
+        else:
+            fetched = {}
+        
+        if len(features) > len(missing):
+            print(f"  ♻️ RAG cache: {len(features) - len(missing)}/{len(features)} queries served from cache")
+        
+        batch_docs = [fetched[key] if key in fetched else self._rag_cache[key] for key in cache_keys]
+        while len(self._rag_cache) > self.RAG_CACHE_SIZE:
+            self._rag_cache.popitem(last=False)
+        
+        return [
+            self._format_rag_analysis(search_query, retrieved_docs)
+            for search_query, retrieved_docs in zip(search_queries, batch_docs)
+        ]
+    
+    def _build_rag_query(self, feature: Dict) -> str:
+        """Enhanced search query for a feature"""
+        return f"Feature: {feature.get('feature_name', '')}\nDescription: {feature.get('description', '')}\n{_RAG_QUERY_SUFFIX}"
+    
+    def _format_rag_analysis(self, search_query: str, retrieved_docs: Dict) -> Optional[Dict]:
+        """Shape one feature's retrieved documents into the rag_analysis block"""
+        try:
             if retrieved_docs and retrieved_docs.get('documents') and retrieved_docs['documents'][0]:
                 documents = retrieved_docs['documents'][0]
                 metadatas = retrieved_docs.get('metadatas', [[]])[0]
                 
                 return {
                     "documents_retrieved": len(documents),
-                    "search_query": search_query.strip(),
+                    "search_query": search_query,
                     "top_documents": [
                         {
                             "title": meta.get('title', f'Document {i+1}') if meta else f'Document {i+1}',
@@ -250,7 +472,7 @@ class EnhancedBEComplianceSystem:
             else:
                 return {
                     "documents_retrieved": 0,
-                    "search_query": search_query.strip(),
+                    "search_query": search_query,
                     "top_documents": [],
                     "rag_influence": "No relevant documents found - using general compliance knowledge"
                 }
@@ -261,7 +483,8 @@ class EnhancedBEComplianceSystem:
     
     def _format_enhanced_result(self, result: EnhancedComplianceResult) -> Dict:
         """Format enhanced result for export"""
-        formatted = asdict(result)
+        # Shallow projection - nested payloads are written once, so they are shared rather than deep-copied
+        formatted = {name: getattr(result, name) for name in _RESULT_FIELDS}
         
         # Add enhanced fields
         formatted["be_service_used"] = True
@@ -278,21 +501,24 @@ class EnhancedBEComplianceSystem:
     
     def _generate_enhanced_recommendations(self, results: Dict) -> List[str]:
         """Generate enhanced system-wide recommendations"""
-        recommendations = []
         summary = results["analysis_summary"]
         rag_perf = results["rag_performance"]
+        total = summary["total_features"]
+        need = summary["features_requiring_compliance"]
+        high = summary["high_risk_features"]
+        docs = rag_perf["documents_retrieved"]
         
         # Enhanced recommendations based on BE service results
-        recommendations.append(f"🔧 BE Service Analysis: {summary['total_features']} features processed using Flask + Multi-Agent architecture")
-        
-        if summary["features_requiring_compliance"] > 0:
-            recommendations.append(f"⚖️ Compliance Implementation: {summary['features_requiring_compliance']} features need compliance logic")
+        recommendations = [f"🔧 BE Service Analysis: {total} features processed using Flask + Multi-Agent architecture"]
+        for condition, message in (
+            (need > 0, f"⚖️ Compliance Implementation: {need} features need compliance logic"),
+            (high > 0, f"🚨 High Priority: {high} features require immediate attention"),
+        ):
+            if condition:
+                recommendations.append(message)
         
-        if summary["high_risk_features"] > 0:
-            recommendations.append(f"🚨 High Priority: {summary['high_risk_features']} features require immediate attention")
-        
-        if rag_perf["documents_retrieved"] > 0:
-            recommendations.append(f"📚 RAG Performance: {rag_perf['documents_retrieved']} legal documents retrieved (avg relevance: {rag_perf['avg_relevance']:.2f})")
+        if docs > 0:
+            recommendations.append(f"📚 RAG Performance: {docs} legal documents retrieved (avg relevance: {rag_perf['avg_relevance']:.2f})")
         else:
             recommendations.append("📚 RAG Status: Using fallback knowledge - consider adding more legal documents")
         
@@ -308,114 +534,135 @@ class EnhancedBEComplianceSystem:
             formats = ["json", "csv", "summary", "audit"]
         
         export_files = {}
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        # Name files after the run's wall-clock anchor rather than reading the clock again
+        analysis_timestamp = results.get("analysis_summary", {}).get("analysis_timestamp")
+        started = datetime.fromisoformat(analysis_timestamp) if analysis_timestamp else datetime.now()
+        timestamp = started.strftime("%Y%m%d_%H%M%S")
         
         print(f"\n📤 Exporting enhanced BE results in {len(formats)} formats...")
         
-        # Enhanced JSON export
+        exports = []
         if "json" in formats:
-            json_file = os.path.join(self.output_dir, f"enhanced_be_analysis_{timestamp}.json")
-            enhanced_results = results.copy()
-            enhanced_results["system_metadata"] = {
-                "backend_type": "Flask + Multi-Agent",
-                "rag_forced": True,
-                "vector_store_type": "ChromaDB with SimpleFallback",
-                "llm_model": ComplianceConfig.OPENROUTER_MODEL,
-                "analysis_engine": "BE Services"
-            }
-            
-            with open(json_file, 'w', encoding='utf-8') as f:
-                json.dump(enhanced_results, f, indent=2, ensure_ascii=False)
-            export_files["json"] = json_file
-            print(f"  ✅ Enhanced JSON: {json_file}")
-        
-        # Enhanced CSV export
+            exports.append(("json", "Enhanced JSON", self._export_enhanced_json, results,
+                            os.path.join(self.output_dir, f"enhanced_be_analysis_{timestamp}.json")))
         if "csv" in formats:
-            csv_file = os.path.join(self.output_dir, f"enhanced_be_analysis_{timestamp}.csv")
-            self._export_enhanced_csv(results["detailed_results"], csv_file)
-            export_files["csv"] = csv_file
-            print(f"  ✅ Enhanced CSV: {csv_file}")
-        
-        # Enhanced summary
+            exports.append(("csv", "Enhanced CSV", self._export_enhanced_csv, results["detailed_results"],
+                            os.path.join(self.output_dir, f"enhanced_be_analysis_{timestamp}.csv")))
         if "summary" in formats:
-            summary_file = os.path.join(self.output_dir, f"enhanced_be_summary_{timestamp}.txt")
-            self._export_enhanced_summary(results, summary_file)
-            export_files["summary"] = summary_file
-            print(f"  ✅ Enhanced Summary: {summary_file}")
+            exports.append(("summary", "Enhanced Summary", self._export_enhanced_summary, results,
+                            os.path.join(self.output_dir, f"enhanced_be_summary_{timestamp}.txt")))
+        
+        # File writes block - run them in worker threads, concurrently, off the event loop
+        await asyncio.gather(*(
+            run_blocking(export, data, filename) for _, _, export, data, filename in exports
+        ))
+        
+        for format_type, label, _, _, filename in exports:
+            export_files[format_type] = filename
+            print(f"  ✅ {label}: {filename}")
         
         return export_files
     
+    def _export_enhanced_json(self, results: Dict, filename: str):
+        """Export full results plus BE system metadata as JSON"""
+        enhanced_results = results.copy()
+        enhanced_results["system_metadata"] = {
+            "backend_type": "Flask + Multi-Agent",
+            "rag_forced": True,
+            "vector_store_type": "ChromaDB with SimpleFallback",
+            "llm_model": ComplianceConfig.OPENROUTER_MODEL,
+            "analysis_engine": "BE Services"
+        }
+        
+        if ORJSON_AVAILABLE:
+            # orjson encodes natively and emits UTF-8 bytes (non-ASCII kept as-is)
+            with open(filename, 'wb') as f:
+                f.write(orjson.dumps(enhanced_results, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+        else:
+            with open(filename, 'w', encoding='utf-8') as f:
+                json.dump(enhanced_results, f, indent=2, ensure_ascii=False)
+    
     def _export_enhanced_csv(self, detailed_results: List[Dict], filename: str):
         """Export enhanced results to CSV"""
-        fieldnames = [
-            "feature_id", "feature_name", "needs_compliance_logic", "confidence",
-            "risk_level", "action_required", "analysis_type", "be_service_used",
-            "rag_enhanced", "rag_documents_found", "applicable_regulations_count",
-            "timestamp"
-        ]
-        
         with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            writer.writeheader()
+            writer = csv.writer(csvfile)
+            writer.writerow(_CSV_FIELDNAMES)
             
-            for result in detailed_results:
-                row = {
-                    "feature_id": result["feature_id"],
-                    "feature_name": result["feature_name"],
-                    "needs_compliance_logic": result["needs_compliance_logic"],
-                    "confidence": result["confidence"],
-                    "risk_level": result["risk_level"],
-                    "action_required": result["action_required"],
-                    "analysis_type": result["analysis_type"],
-                    "be_service_used": result.get("be_service_used", True),
-                    "rag_enhanced": result.get("rag_enhanced", False),
-                    "rag_documents_found": result.get("rag_summary", {}).get("documents_found", 0),
-                    "applicable_regulations_count": len(result.get("applicable_regulations", [])),
-                    "timestamp": result["timestamp"]
-                }
-                writer.writerow(row)
+            if self._csv_columns and self._csv_columns[0] is detailed_results:
+                # Columns collected during analysis - rows go straight to the C writer
+                columns = self._csv_columns[1]
+                writer.writerows(zip(*(columns[name] for name in _CSV_FIELDNAMES)))
+                return
+            
+            # Results not produced by the latest run - build rows (in _CSV_FIELDNAMES order) from the formatted dicts
+            writer.writerows(
+                (
+                    r["feature_id"],
+                    r["feature_name"],
+                    r["needs_compliance_logic"],
+                    r["confidence"],
+                    r["risk_level"],
+                    r["action_required"],
+                    r["analysis_type"],
+                    r.get("be_service_used", True),
+                    r.get("rag_enhanced", False),
+                    r.get("rag_summary", {}).get("documents_found", 0),
+                    len(r.get("applicable_regulations", [])),
+                    r["timestamp"]
+                )
+                for r in detailed_results
+            )
     
     def _export_enhanced_summary(self, results: Dict, filename: str):
         """Export enhanced executive summary"""
+        with open(filename, 'w', encoding='utf-8') as f:
+            f.write(self._build_enhanced_summary(results))
+    
+    def _build_enhanced_summary(self, results: Dict) -> str:
+        """Build the executive summary text in a single in-memory buffer"""
         summary = results["analysis_summary"]
+        rag_perf = results["rag_performance"]
+        buf = io.StringIO()
+        w = buf.write
         
-        with open(filename, 'w', encoding='utf-8') as f:
-            f.write("Enhanced TikTok Compliance Analysis - BE Services\n")
-            f.write("=" * 55 + "\n\n")
-            
-            f.write(f"Analysis Date: {summary['analysis_timestamp']}\n")
-            f.write(f"System Version: {summary['system_version']}\n")
-            f.write(f"Backend Architecture: {summary['backend_architecture']}\n\n")
-            
-            f.write("📊 ENHANCED OVERVIEW\n")
-            f.write("-" * 25 + "\n")
-            f.write(f"Total Features Analyzed: {summary['total_features']}\n")
-            f.write(f"BE Services Used: ✅ Flask + Multi-Agent\n")
-            f.write(f"RAG Status: ✅ Forced enabled\n")
-            f.write(f"Features Requiring Compliance: {summary['features_requiring_compliance']}\n")
-            f.write(f"High Risk Features: {summary['high_risk_features']}\n")
-            f.write(f"Human Review Needed: {summary['human_review_needed']}\n\n")
-            
-            f.write("📚 RAG PERFORMANCE\n")
-            f.write("-" * 20 + "\n")
-            rag_perf = results["rag_performance"]
-            f.write(f"Documents Retrieved: {rag_perf['documents_retrieved']}\n")
-            f.write(f"Average Relevance: {rag_perf['avg_relevance']:.2f}\n")
-            f.write(f"Fallback Used: {rag_perf['fallback_used']}\n")
-            f.write(f"Vector Store Type: {rag_perf.get('vector_store_type', 'Unknown')}\n\n")
-            
-            f.write("🎯 ENHANCED RECOMMENDATIONS\n")
-            f.write("-" * 30 + "\n")
-            for i, rec in enumerate(results["recommendations"], 1):
-                f.write(f"{i}. {rec}\n")
-            
-            f.write(f"\n🔗 BE ARCHITECTURE VALIDATION\n")
-            f.write("-" * 35 + "\n")
-            f.write("✅ Flask API integration successful\n")
-            f.write("✅ Multi-agent orchestration working\n")
-            f.write("✅ RAG forced enablement functional\n")
-            f.write("✅ Enhanced prompt format applied\n")
-            f.write("✅ Vector store integration confirmed\n")
+        w("Enhanced TikTok Compliance Analysis - BE Services\n")
+        w("=" * 55 + "\n\n")
+        
+        w(f"Analysis Date: {summary['analysis_timestamp']}\n")
+        w(f"System Version: {summary['system_version']}\n")
+        w(f"Backend Architecture: {summary['backend_architecture']}\n\n")
+        
+        w("📊 ENHANCED OVERVIEW\n")
+        w("-" * 25 + "\n")
+        w(f"Total Features Analyzed: {summary['total_features']}\n")
+        w("BE Services Used: ✅ Flask + Multi-Agent\n")
+        w("RAG Status: ✅ Forced enabled\n")
+        w(f"Features Requiring Compliance: {summary['features_requiring_compliance']}\n")
+        w(f"High Risk Features: {summary['high_risk_features']}\n")
+        w(f"Human Review Needed: {summary['human_review_needed']}\n\n")
+        
+        w("📚 RAG PERFORMANCE\n")
+        w("-" * 20 + "\n")
+        w(f"Documents Retrieved: {rag_perf['documents_retrieved']}\n")
+        w(f"Average Relevance: {rag_perf['avg_relevance']:.2f}\n")
+        w(f"Fallback Used: {rag_perf['fallback_used']}\n")
+        w(f"Vector Store Type: {rag_perf.get('vector_store_type', 'Unknown')}\n\n")
+        
+        w("🎯 ENHANCED RECOMMENDATIONS\n")
+        w("-" * 30 + "\n")
+        if results["recommendations"]:
+            w("\n".join(f"{i}. {rec}" for i, rec in enumerate(results["recommendations"], 1)))
+            w("\n")
+        
+        w("\n🔗 BE ARCHITECTURE VALIDATION\n")
+        w("-" * 35 + "\n")
+        w("✅ Flask API integration successful\n")
+        w("✅ Multi-agent orchestration working\n")
+        w("✅ RAG forced enablement functional\n")
+        w("✅ Enhanced prompt format applied\n")
+        w("✅ Vector store integration confirmed\n")
+        
+        return buf.getvalue()
 
 async def main():
     """Main function for testing the enhanced BE system"""
@@ -449,23 +696,28 @@ async def main():
     # Initialize and run enhanced BE analysis
     system = EnhancedBEComplianceSystem()
     
-    print("\n🚀 Starting enhanced BE compliance analysis...")
-    results = await system.analyze_feature_list(sample_features, include_rag_analysis=True)
-    
-    # Export in enhanced formats
-    export_files = await system.export_enhanced_results(results, formats=["json", "csv", "summary"])
-    
-    print(f"\n🎯 Enhanced BE Analysis complete! Files exported:")
-    for format_type, file_path in export_files.items():
-        print(f"  📄 {format_type.upper()}: {file_path}")
+    try:
+        print("\n🚀 Starting enhanced BE compliance analysis...")
+        results = await system.analyze_feature_list(sample_features, include_rag_analysis=True)
+        
+        # Export in enhanced formats
+        export_files = await system.export_enhanced_results(results, formats=["json", "csv", "summary"])
+    finally:
+        system.close()
     
-    print(f"\n🏗️ BE Architecture Validation:")
-    print(f"  ✅ Flask services integration successful")
-    print(f"  ✅ Multi-agent orchestration working")
-    print(f"  ✅ RAG forced enablement confirmed")
-    print(f"  ✅ Enhanced prompt format applied")
+    # Emit the closing report in one write
+    lines = [f"\n🎯 Enhanced BE Analysis complete! Files exported:"]
+    lines.extend(f"  📄 {format_type.upper()}: {file_path}" for format_type, file_path in export_files.items())
+    lines += [
+        f"\n🏗️ BE Architecture Validation:",
+        f"  ✅ Flask services integration successful",
+        f"  ✅ Multi-agent orchestration working",
+        f"  ✅ RAG forced enablement confirmed",
+        f"  ✅ Enhanced prompt format applied",
+    ]
+    print("\n".join(lines))
     
     return results
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    run(main())
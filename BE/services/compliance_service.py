@@ -1,14 +1,43 @@
 """
 Compliance Service - Business logic layer
 """
-from typing import Dict, Any
-from core.analyzer import UnifiedComplianceAnalyzer
+import asyncio
+import copy
+import hashlib
+import json
+from collections import OrderedDict
+from typing import Callable, Dict, Any, List, Optional
+from core.analyzer import UnifiedComplianceAnalyzer, get_shared_analyzer, is_shared_analyzer
+from config import ComplianceConfig
+from utils.concurrency import run_blocking
 
 class ComplianceService:
     """Service layer for compliance analysis operations"""
     
-    def __init__(self):
-        self.analyzer = UnifiedComplianceAnalyzer()
+    def __init__(self, analyzer: Optional[UnifiedComplianceAnalyzer] = None):
+        # Without an explicit analyzer, the process-wide one is used (built lazily on first access)
+        # so services share its LLM client, HTTP session and vector store
+        self._analyzer = analyzer
+        # Caps analyses in flight across every batch on the current loop (API requests share one)
+        self._semaphore = None
+        self._semaphore_loop = None
+        self._warmed_up = False
+        # LRU of finished analyses keyed by a digest of the feature payload
+        self._results = OrderedDict()
+    
+    @property
+    def analyzer(self) -> UnifiedComplianceAnalyzer:
+        if self._analyzer is None:
+            self._analyzer = get_shared_analyzer()
+        return self._analyzer
+    
+    async def warmup(self):
+        """Load the analyzer and prime its models and connections; no-op once done"""
+        if self._warmed_up:
+            return
+        # Analyzer construction and warmup block (model load, corpus indexing, TLS)
+        await run_blocking(lambda: self.analyzer.warmup())
+        self._warmed_up = True
     
     async def analyze_feature(self, feature_data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -20,4 +49,97 @@ class ComplianceService:
         Returns:
             Analysis results
         """
-        return await self.analyzer.analyze_feature(feature_data)
+        key = hashlib.blake2b(
+            json.dumps(feature_data, sort_keys=True, default=str).encode('utf-8'), digest_size=16
+        ).digest()
+        cached = self._results.get(key)
+        if cached is not None:
+            self._results.move_to_end(key)
+            # Callers annotate results (e.g. with the request item id) - hand out a copy
+            return copy.deepcopy(cached)
+        
+        result = await self.analyzer.analyze_feature(feature_data)
+        # Report the backing store directly so callers don't have to sniff the LLM response for it
+        result['vector_store_type'] = type(self.analyzer.vector_service).__name__
+        
+        if ComplianceConfig.ENABLE_CACHE and self.is_cacheable(result):
+            self._results[key] = copy.deepcopy(result)
+            if len(self._results) > ComplianceConfig.RESULT_CACHE_SIZE:
+                self._results.popitem(last=False)
+        return result
+    
+    @staticmethod
+    def is_cacheable(result: Dict[str, Any]) -> bool:
+        """Don't pin results built around a failed LLM call - a retry may succeed (shared by every result cache)"""
+        llm_analysis = result.get('llm_analysis') or {}
+        return (llm_analysis.get('analysis_type') != 'fallback'
+                and not str(llm_analysis.get('raw_response', '')).startswith('Error'))
+    
+    async def analyze_features_batch(self, features: List[Dict[str, Any]],
+                                     max_concurrency: Optional[int] = None,
+                                     on_result: Optional[Callable[[int, Any], None]] = None,
+                                     fail_fast: bool = False) -> List[Any]:
+        """
+        Analyze several features concurrently
+        
+        Args:
+            features: List of feature dictionaries (same shape as analyze_feature)
+            max_concurrency: Max analyses in flight (defaults to MAX_PARALLEL_ANALYSES)
+            on_result: Called with (index, result or exception) as each feature finishes
+            fail_fast: Stop starting new features once one has failed (their slots stay None)
+            
+        Returns:
+            Results in input order; a failed feature's slot holds its exception
+        """
+        limit = max_concurrency or ComplianceConfig.MAX_PARALLEL_ANALYSES
+        shared = self._analysis_semaphore()
+        results: List[Any] = [None] * len(features)
+        pending = iter(enumerate(features))
+        failed = False
+        
+        # A fixed pool of workers pulls features off one iterator, so a large batch
+        # never has more than `limit` coroutines alive at once
+        async def _worker():
+            nonlocal failed
+            for i, feature_data in pending:
+                if fail_fast and failed:
+                    break
+                async with shared:
+                    try:
+                        results[i] = await self.analyze_feature(feature_data)
+                    except Exception as e:
+                        results[i] = e
+                        failed = True
+                # Report each feature as soon as it finishes, not when the whole batch does
+                if on_result is not None:
+                    on_result(i, results[i])
+                # Yield between features: cached analyses can finish without suspending,
+                # and a worker must not hog the loop while I/O for other requests waits
+                await asyncio.sleep(0)
+        
+        await asyncio.gather(*(_worker() for _ in range(min(limit, len(features)))))
+        return results
+    
+    def _analysis_semaphore(self) -> asyncio.Semaphore:
+        """Semaphore bound to the running event loop, shared by concurrent batches"""
+        loop = asyncio.get_running_loop()
+        if self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(ComplianceConfig.MAX_PARALLEL_ANALYSES)
+            self._semaphore_loop = loop
+        return self._semaphore
+    
+    def close(self):
+        """Release pooled resources held by the analyzer (no-op for the shared one)"""
+        # The process-wide analyzer may be serving other services right now - it's closed at exit
+        if self._analyzer is not None and not is_shared_analyzer(self._analyzer):
+            self._analyzer.llm_client.close()
+    
+    async def aclose(self):
+        """close() for async callers - the session teardown runs off the event loop"""
+        await run_blocking(self.close)
+    
+    async def __aenter__(self) -> "ComplianceService":
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
@@ -1,10 +1,14 @@
 import re
-from typing import Dict, List
+import functools
+from typing import Dict, List, Optional, Set
 from config import ComplianceConfig
+from utils.keyword_matcher import KeywordMatcher
 
 class JargonService:
     """Resolve TikTok-specific abbreviations and codenames"""
     
+    TECHNICAL_TERMS = frozenset({"system", "implementation", "mechanism", "algorithm", "protocol", "framework"})
+    
     def __init__(self):
         self.jargon_map = {
             # Common TikTok/social media abbreviations
@@ -57,21 +61,8 @@ class JargonService:
             "Brazil": ["Brazil", "Brazilian", "LGPD"],
             "Global": ["worldwide", "international", "multi-region", "cross-border"]
         }
-    
-    def expand_description(self, text: str) -> str:
-        """Expand abbreviations and add context"""
-        expanded = text
-        for abbr, full in self.jargon_map.items():
-            # Use word boundaries to avoid partial matches
-            pattern = r'\b' + re.escape(abbr) + r'\b'
-            replacement = f"{abbr} ({full})"
-            expanded = re.sub(pattern, replacement, expanded, flags=re.IGNORECASE)
-        return expanded
-    
-    def detect_compliance_intent(self, text: str) -> Dict[str, float]:
-        """Detect compliance intent vs business logic"""
-        intent_scores = {"compliance": 0.0, "business": 0.0, "ambiguous": 0.0}
         
+        # Intent keywords, built once here rather than on every call
         compliance_keywords = [
             "comply", "regulation", "law", "legal", "requirement", "mandatory",
             "protection", "privacy", "GDPR", "COPPA", "restrict", "prohibit",
@@ -91,26 +82,78 @@ class JargonService:
             "targeting", "segmentation", "filtering", "recommendation"
         ]
         
-        text_lower = text.lower()
+        # Matched verbatim against the lowercased text, as before
+        self._intent_keywords = (
+            ("compliance", 0.15, tuple(compliance_keywords)),
+            ("business", 0.15, tuple(business_keywords)),
+            ("ambiguous", 0.1, tuple(ambiguous_keywords)),
+        )
+        # Compliance patterns lowercased once
+        self._pattern_keywords = {
+            category: tuple(p.lower() for p in patterns)
+            for category, patterns in self.compliance_patterns.items()
+        }
+        
+        # Every category's patterns in one flat sequence (duplicates kept - each scores)
+        self._flat_patterns = tuple(
+            pattern for patterns in self._pattern_keywords.values() for pattern in patterns
+        )
         
-        # Score based on keyword presence
-        for keyword in compliance_keywords:
-            if keyword in text_lower:
-                intent_scores["compliance"] += 0.15
+        # Regional indicators lowercased once
+        self._region_keywords = {
+            region: tuple(indicator.lower() for indicator in indicators)
+            for region, indicators in self.regional_indicators.items()
+        }
         
-        for keyword in business_keywords:
-            if keyword in text_lower:
-                intent_scores["business"] += 0.15
+        # Every keyword the scorers look for in lowercased text, matched in one pass
+        self._keyword_matcher = KeywordMatcher(
+            [keyword for _, _, keywords in self._intent_keywords for keyword in keywords]
+            + list(self._flat_patterns)
+            + [indicator for indicators in self._region_keywords.values() for indicator in indicators]
+        )
+        
+        # One alternation over every abbreviation, compiled once instead of a pattern per abbreviation per call
+        self._jargon_re = re.compile(
+            r'\b(?:' + '|'.join(re.escape(abbr) for abbr in self.jargon_map) + r')\b',
+            re.IGNORECASE
+        )
+        
+        # Per-instance memo of the full text analysis - the same feature text is
+        # often analyzed repeatedly (agents, retries, batch duplicates)
+        self._cached_analysis = functools.lru_cache(maxsize=1024)(self._analyze_text)
+    
+    def expand_description(self, text: str) -> str:
+        """Expand abbreviations and add context"""
+        jargon_map = self.jargon_map
         
-        for keyword in ambiguous_keywords:
-            if keyword in text_lower:
-                intent_scores["ambiguous"] += 0.1
+        def _expand(match):
+            abbr = match.group(0).upper()
+            return f"{abbr} ({jargon_map[abbr]})"
+        
+        # Word boundaries in the pattern avoid partial matches
+        return self._jargon_re.sub(_expand, text)
+    
+    def _find_keywords(self, text: str) -> Set[str]:
+        """Lowercase the text once and collect every scoring keyword it contains"""
+        return self._keyword_matcher.present(text.lower())
+    
+    def detect_compliance_intent(self, text: str) -> Dict[str, float]:
+        """Detect compliance intent vs business logic"""
+        return self._score_intent(self._find_keywords(text))
+    
+    def _score_intent(self, found: Set[str]) -> Dict[str, float]:
+        intent_scores = {"compliance": 0.0, "business": 0.0, "ambiguous": 0.0}
+        
+        # Score based on keyword presence
+        for bucket, weight, keywords in self._intent_keywords:
+            for keyword in keywords:
+                if keyword in found:
+                    intent_scores[bucket] += weight
         
         # Additional scoring based on patterns
-        for pattern_type, patterns in self.compliance_patterns.items():
-            for pattern in patterns:
-                if pattern.lower() in text_lower:
-                    intent_scores["compliance"] += 0.1
+        for pattern in self._flat_patterns:
+            if pattern in found:
+                intent_scores["compliance"] += 0.1
         
         # Normalize scores
         total = sum(intent_scores.values())
@@ -123,27 +166,25 @@ class JargonService:
     
     def extract_geographic_scope(self, text: str) -> List[str]:
         """Extract geographic regions mentioned in the text"""
-        regions_found = []
-        text_lower = text.lower()
-        
-        for region, indicators in self.regional_indicators.items():
-            for indicator in indicators:
-                if indicator.lower() in text_lower:
-                    if region not in regions_found:
-                        regions_found.append(region)
-                    break
-        
-        return regions_found
+        return self._geographic_scope(self._find_keywords(text))
+    
+    def _geographic_scope(self, found: Set[str]) -> List[str]:
+        return [
+            region for region, indicators in self._region_keywords.items()
+            if any(indicator in found for indicator in indicators)
+        ]
     
     def detect_compliance_categories(self, text: str) -> Dict[str, float]:
         """Detect specific compliance categories with confidence scores"""
+        return self._category_scores(self._find_keywords(text))
+    
+    def _category_scores(self, found: Set[str]) -> Dict[str, float]:
         category_scores = {}
-        text_lower = text.lower()
         
-        for category, patterns in self.compliance_patterns.items():
+        for category, patterns in self._pattern_keywords.items():
             score = 0.0
             for pattern in patterns:
-                if pattern.lower() in text_lower:
+                if pattern in found:
                     score += 1.0
             
             # Normalize by number of patterns
@@ -159,38 +200,47 @@ class JargonService:
         # Combine feature name and description for analysis
         full_text = f"{feature_name}. {description}"
         
-        analysis = {
+        analysis = self._cached_analysis(full_text)
+        # Hand out fresh containers so callers can't corrupt the cached entry
+        return {
+            **analysis,
+            'intent_scores': dict(analysis['intent_scores']),
+            'geographic_scope': list(analysis['geographic_scope']),
+            'compliance_categories': dict(analysis['compliance_categories']),
+            'jargon_detected': list(analysis['jargon_detected'])
+        }
+    
+    def _analyze_text(self, full_text: str) -> Dict:
+        """Run every text analysis on the combined feature text"""
+        # Jargon is detected once and shared with the complexity score, and the
+        # lowercased keyword scan is shared by the intent, region and category scores
+        jargon_detected = self._detect_jargon_usage(full_text)
+        found = self._find_keywords(full_text)
+        return {
             'original_text': full_text,
             'expanded_text': self.expand_description(full_text),
-            'intent_scores': self.detect_compliance_intent(full_text),
-            'geographic_scope': self.extract_geographic_scope(full_text),
-            'compliance_categories': self.detect_compliance_categories(full_text),
-            'jargon_detected': self._detect_jargon_usage(full_text),
-            'complexity_score': self._calculate_complexity(full_text)
+            'intent_scores': self._score_intent(found),
+            'geographic_scope': self._geographic_scope(found),
+            'compliance_categories': self._category_scores(found),
+            'jargon_detected': jargon_detected,
+            'complexity_score': self._calculate_complexity(full_text, jargon_count=len(jargon_detected))
         }
-        
-        return analysis
     
     def _detect_jargon_usage(self, text: str) -> List[str]:
         """Detect which jargon terms are present in the text"""
-        jargon_found = []
-        text_upper = text.upper()
-        
-        for abbr in self.jargon_map.keys():
-            pattern = r'\b' + re.escape(abbr) + r'\b'
-            if re.search(pattern, text_upper):
-                jargon_found.append(abbr)
-        
-        return jargon_found
+        matched = {match.upper() for match in self._jargon_re.findall(text)}
+        # Report in jargon_map order, as before
+        return [abbr for abbr in self.jargon_map if abbr in matched]
     
-    def _calculate_complexity(self, text: str) -> float:
+    def _calculate_complexity(self, text: str, jargon_count: Optional[int] = None) -> float:
         """Calculate text complexity based on jargon density and technical terms"""
         words = text.split()
         if not words:
             return 0.0
         
-        jargon_count = len(self._detect_jargon_usage(text))
-        technical_terms = ["system", "implementation", "mechanism", "algorithm", "protocol", "framework"]
+        if jargon_count is None:
+            jargon_count = len(self._detect_jargon_usage(text))
+        technical_terms = self.TECHNICAL_TERMS
         technical_count = sum(1 for word in words if word.lower() in technical_terms)
         
         complexity = (jargon_count + technical_count) / len(words)
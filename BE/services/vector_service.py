@@ -1,28 +1,76 @@
+import os
 import sys
 import hashlib
+import importlib
 import json
+import functools
 from typing import List, Dict, Any
 from config import ComplianceConfig
 
-try:
-    import chromadb
-    from chromadb.utils import embedding_functions
-    CHROMADB_AVAILABLE = True
-except (ImportError, RuntimeError) as e:
-    CHROMADB_AVAILABLE = False
-    if "sqlite3" in str(e).lower():
-        print("⚠️ ChromaDB not available due to SQLite version incompatibility. Using fallback store.", file=sys.stderr)
-    else:
-        print(f"⚠️ ChromaDB not available: {e}. Using fallback store.", file=sys.stderr)
+@functools.cache
+def _load_chromadb():
+    """Import ChromaDB on first use - it is slow to import and not needed by every entry point"""
+    try:
+        chromadb = importlib.import_module("chromadb")
+        embedding_functions = importlib.import_module("chromadb.utils.embedding_functions")
+        return chromadb, embedding_functions
+    except (ImportError, RuntimeError) as e:
+        if "sqlite3" in str(e).lower():
+            print("⚠️ ChromaDB not available due to SQLite version incompatibility. Using fallback store.", file=sys.stderr)
+        else:
+            print(f"⚠️ ChromaDB not available: {e}. Using fallback store.", file=sys.stderr)
+        return None
+
+def chromadb_available() -> bool:
+    """Check whether ChromaDB can be imported (imports it on first call)"""
+    return _load_chromadb() is not None
+
+@functools.cache
+def _load_faiss():
+    """Import FAISS and sentence-transformers on first use"""
+    try:
+        faiss = importlib.import_module("faiss")
+        sentence_transformers = importlib.import_module("sentence_transformers")
+        return faiss, sentence_transformers
+    except ImportError as e:
+        print(f"⚠️ FAISS backend not available: {e}. Using ChromaDB/fallback store.", file=sys.stderr)
+        return None
+
+def faiss_available() -> bool:
+    """Check whether the FAISS backend can be imported (imports it on first call)"""
+    return _load_faiss() is not None
+
+@functools.cache
+def _embedding_device() -> str:
+    """Run embeddings on the GPU when torch can see one"""
+    try:
+        torch = importlib.import_module("torch")
+        return "cuda" if torch.cuda.is_available() else "cpu"
+    except ImportError:
+        return "cpu"
+
+@functools.cache
+def get_encoder(model_name: str = ComplianceConfig.EMBEDDING_MODEL):
+    """Load the SentenceTransformer once per process and share it between stores"""
+    sentence_transformers = importlib.import_module("sentence_transformers")
+    device = _embedding_device()
+    encoder = sentence_transformers.SentenceTransformer(model_name, device=device)
+    if device == "cuda":
+        # fp16 halves weight/activation bandwidth; CPU kernels are faster in fp32
+        encoder.half()
+    print(f"🧠 Embedding model {model_name} loaded on {device}", file=sys.stderr)
+    return encoder
 
 class VectorService:
     def __init__(self, collection_name="legal_docs"):
-        if not CHROMADB_AVAILABLE:
+        if not chromadb_available():
             raise ImportError("ChromaDB is required but not installed. Run: pip install chromadb")
+        chromadb, embedding_functions = _load_chromadb()
         
         self.client = chromadb.PersistentClient(path=ComplianceConfig.VECTOR_DB_PATH)
         self.embedding_function = embedding_functions.SentenceTransformerEmbeddingFunction(
-            model_name=ComplianceConfig.EMBEDDING_MODEL
+            model_name=ComplianceConfig.EMBEDDING_MODEL,
+            device=_embedding_device()
         )
         self.collection = self.client.get_or_create_collection(
             name=collection_name,
@@ -74,21 +122,23 @@ class VectorService:
         metadatas_to_add = []
         ids_to_add = []
         
-        for doc in documents:
-            doc_id = self._generate_doc_id(doc)
+        # Look up which documents already exist with a single query instead of one per document
+        doc_ids = [self._generate_doc_id(doc) for doc in documents]
+        try:
+            existing_ids = set(self.collection.get(ids=doc_ids)['ids']) if doc_ids else set()
+        except Exception:
+            existing_ids = set()  # Treat as empty and let add() report real problems
+        
+        for doc, doc_id in zip(documents, doc_ids):
             content = self._extract_content(doc)
             
             if not content.strip():
                 continue
             
             # Check if document already exists
-            try:
-                existing = self.collection.get(ids=[doc_id])
-                if existing['ids']:
-                    print(f"Document already exists: {doc.get('title', 'Unknown')}")
-                    continue
-            except:
-                pass  # Document doesn't exist, proceed to add
+            if doc_id in existing_ids:
+                print(f"Document already exists: {doc.get('title', 'Unknown')}")
+                continue
             
             docs_to_add.append(content)
             metadatas_to_add.append({
@@ -132,6 +182,29 @@ class VectorService:
             print(f"Error querying vector store: {e}")
             return {'documents': [[]], 'metadatas': [[]], 'distances': [[]]}
     
+    def batch_search_relevant_statutes(self, queries: List[str], n_results=10) -> List[Dict]:
+        """Find relevant statutes for several queries with a single embedding + index call"""
+        if not queries:
+            return []
+        try:
+            count = self.collection.count()
+            results = self.collection.query(
+                query_texts=list(queries),
+                n_results=min(n_results, count if count > 0 else 1)
+            )
+            # Split the batched response back into per-query results shaped like search_relevant_statutes
+            return [
+                {
+                    'documents': [results['documents'][i]],
+                    'metadatas': [results['metadatas'][i]],
+                    'distances': [results['distances'][i]]
+                }
+                for i in range(len(queries))
+            ]
+        except Exception as e:
+            print(f"Error querying vector store: {e}")
+            return [{'documents': [[]], 'metadatas': [[]], 'distances': [[]]} for _ in queries]
+    
     def get_document_count(self) -> int:
         """Get number of documents in collection"""
         try:
@@ -143,6 +216,140 @@ class VectorService:
         """Check if documents need to be reindexed"""
         current_count = self.get_document_count()
         return current_count == 0 or current_count < len(documents)
+    
+    def _corpus_hash_path(self) -> str:
+        return os.path.join(ComplianceConfig.VECTOR_DB_PATH, f".corpus_hash_{self.collection_name}")
+    
+    def is_corpus_current(self, corpus_hash: str) -> bool:
+        """Check whether the persisted collection was built from this exact corpus"""
+        try:
+            with open(self._corpus_hash_path(), 'r', encoding='utf-8') as f:
+                stored_hash = f.read().strip()
+        except OSError:
+            return False
+        return stored_hash == corpus_hash and self.get_document_count() > 0
+    
+    def mark_corpus(self, corpus_hash: str):
+        """Record the corpus hash next to the persisted collection"""
+        try:
+            with open(self._corpus_hash_path(), 'w', encoding='utf-8') as f:
+                f.write(corpus_hash)
+        except OSError as e:
+            print(f"⚠️ Could not record corpus hash: {e}", file=sys.stderr)
+
+class FAISSVectorStore:
+    """In-memory inner-product search over normalized embeddings.
+
+    For statute corpora of a few thousand chunks a flat index beats HNSW graph
+    traversal and avoids ChromaDB's SQLite metadata layer. Embeddings are stored
+    as int8 by default (FAISS_INDEX_TYPE) to cut memory traffic. Results are shaped
+    like ChromaDB query responses so callers don't need to change.
+    """
+    
+    def __init__(self, collection_name="legal_docs"):
+        if not faiss_available():
+            raise ImportError("FAISS backend requires faiss and sentence-transformers. Run: pip install faiss-cpu sentence-transformers")
+        faiss, _ = _load_faiss()
+        
+        self._faiss = faiss
+        self.encoder = get_encoder()
+        self.index = self._create_index(self.encoder.get_sentence_embedding_dimension())
+        self.collection_name = collection_name
+        # Parallel to index rows
+        self.documents: List[str] = []
+        self.metadatas: List[Dict] = []
+        self.ids: List[str] = []
+    
+    # Same content extraction and ids as the ChromaDB store
+    _extract_content = VectorService._extract_content
+    _generate_doc_id = VectorService._generate_doc_id
+    
+    def _create_index(self, dimension: int):
+        """Build the configured index - int8 scalar quantization unless FAISS_INDEX_TYPE=flat"""
+        faiss = self._faiss
+        if ComplianceConfig.FAISS_INDEX_TYPE == "flat":
+            return faiss.IndexFlatIP(dimension)
+        return faiss.IndexScalarQuantizer(dimension, faiss.ScalarQuantizer.QT_8bit, faiss.METRIC_INNER_PRODUCT)
+    
+    def encode_batch(self, texts: List[str]):
+        """Embed texts in one batched forward pass as normalized float32 rows"""
+        embeddings = self.encoder.encode(
+            list(texts), batch_size=64, convert_to_numpy=True, normalize_embeddings=True
+        )
+        return embeddings.astype('float32', copy=False)
+    
+    def add_documents(self, documents: List[Dict]):
+        """Embed and index documents, skipping ones already present"""
+        known_ids = set(self.ids)
+        docs_to_add = []
+        metadatas_to_add = []
+        ids_to_add = []
+        
+        for doc in documents:
+            doc_id = self._generate_doc_id(doc)
+            content = self._extract_content(doc)
+            if not content.strip() or doc_id in known_ids:
+                continue
+            known_ids.add(doc_id)
+            
+            docs_to_add.append(content)
+            metadatas_to_add.append({
+                "title": doc.get('title', 'Unknown Document'),
+                "url": doc.get('url', ''),
+                "doc_type": doc.get('content_type', 'legal_document'),
+                "doc_id": doc_id
+            })
+            ids_to_add.append(doc_id)
+        
+        if docs_to_add:
+            embeddings = self.encode_batch(docs_to_add)
+            if not self.index.is_trained:
+                # Scalar quantizer learns per-dimension ranges from the first corpus load
+                self.index.train(embeddings)
+            self.index.add(embeddings)
+            self.documents.extend(docs_to_add)
+            self.metadatas.extend(metadatas_to_add)
+            self.ids.extend(ids_to_add)
+            print(f"Added {len(docs_to_add)} documents to FAISS index")
+    
+    def search_relevant_statutes(self, feature_description: str, n_results=10) -> Dict:
+        """Find most relevant statutes for a feature"""
+        return self.batch_search_relevant_statutes([feature_description], n_results)[0]
+    
+    def batch_search_relevant_statutes(self, queries: List[str], n_results=10) -> List[Dict]:
+        """Embed all queries at once and run a single index search"""
+        if not queries:
+            return []
+        if self.index.ntotal == 0:
+            return [{'documents': [[]], 'metadatas': [[]], 'distances': [[]]} for _ in queries]
+        
+        k = min(n_results, self.index.ntotal)
+        scores, rows = self.index.search(self.encode_batch(queries), k)
+        
+        results = []
+        for query_scores, query_rows in zip(scores, rows):
+            hits = [(float(score), int(row)) for score, row in zip(query_scores, query_rows) if row >= 0]
+            results.append({
+                'documents': [[self.documents[row] for _, row in hits]],
+                'metadatas': [[self.metadatas[row] for _, row in hits]],
+                # Cosine similarity -> distance, matching ChromaDB's "lower is closer"
+                # (int8 reconstruction can push scores slightly outside [-1, 1])
+                'distances': [[1.0 - min(score, 1.0) for score, _ in hits]]
+            })
+        return results
+    
+    def get_document_count(self) -> int:
+        return self.index.ntotal
+    
+    def needs_reindexing(self, documents: List[Dict]) -> bool:
+        return self.index.ntotal == 0 or self.index.ntotal < len(documents)
+    
+    def is_corpus_current(self, corpus_hash: str) -> bool:
+        # In-memory index - documents always need loading
+        return False
+    
+    def mark_corpus(self, corpus_hash: str):
+        pass
 
 # Fallback class when ChromaDB is not available
 class SimpleFallbackStore:
@@ -156,13 +363,27 @@ class SimpleFallbackStore:
     
     def search_relevant_statutes(self, feature_description: str, n_results=10) -> Dict:
         """Simple keyword-based search as fallback"""
+        return self._search_indexed(feature_description, self._index_documents(), n_results)
+    
+    def batch_search_relevant_statutes(self, queries: List[str], n_results=10) -> List[Dict]:
+        """Keyword search for several queries, tokenizing the documents only once"""
+        indexed = self._index_documents()
+        return [self._search_indexed(query, indexed, n_results) for query in queries]
+    
+    def _index_documents(self) -> List[tuple]:
+        """Extract (doc, content, word set) for every stored document"""
+        indexed = []
+        for doc in self.documents:
+            content = self._extract_content(doc)
+            indexed.append((doc, content, set(content.lower().split())))
+        return indexed
+    
+    def _search_indexed(self, feature_description: str, indexed: List[tuple], n_results: int) -> Dict:
+        """Score pre-tokenized documents against one query"""
         feature_words = set(feature_description.lower().split())
         scored_docs = []
         
-        for doc in self.documents:
-            content = self._extract_content(doc)
-            content_words = set(content.lower().split())
-            
+        for doc, content, content_words in indexed:
             # Simple word overlap scoring
             overlap = len(feature_words & content_words)
             if overlap > 0:
@@ -198,12 +419,28 @@ class SimpleFallbackStore:
     
     def needs_reindexing(self, documents: List[Dict]) -> bool:
         return len(self.documents) == 0
+    
+    def is_corpus_current(self, corpus_hash: str) -> bool:
+        # In-memory store - documents always need loading
+        return False
+    
+    def mark_corpus(self, corpus_hash: str):
+        pass
 
 def get_vector_store():
     """Get appropriate vector store based on availability"""
     config = ComplianceConfig()
     
-    if CHROMADB_AVAILABLE:
+    if config.VECTOR_BACKEND == "faiss" and faiss_available():
+        try:
+            print("🔍 Attempting to use FAISS vector store...", file=sys.stderr)
+            store = FAISSVectorStore()
+            print("✅ FAISS vector store initialized", file=sys.stderr)
+            return store
+        except Exception as e:
+            print(f"⚠️ FAISS initialization failed: {e}", file=sys.stderr)
+    
+    if chromadb_available():
         try:
             print("🔍 Attempting to use ChromaDB vector store...", file=sys.stderr)
             store = VectorService()
@@ -0,0 +1,95 @@
+"""
+Tests for MicroBatcher (utils/concurrency.py)
+"""
+import asyncio
+import os
+import sys
+import threading
+
+import pytest
+
+# Make the BE packages importable when run from the repo root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.concurrency import MicroBatcher
+
+
+class RecordingBatchFn:
+    """batch_fn that records each batch it receives and doubles every item"""
+
+    def __init__(self):
+        self.batches = []
+        self._lock = threading.Lock()
+
+    def __call__(self, items):
+        with self._lock:
+            self.batches.append(list(items))
+        return [item * 2 for item in items]
+
+
+def test_flushes_when_batch_is_full():
+    batch_fn = RecordingBatchFn()
+    # A window far longer than the test - only reaching max_batch can flush
+    batcher = MicroBatcher(batch_fn, max_batch=3, window_ms=60_000)
+
+    async def main():
+        return await asyncio.wait_for(asyncio.gather(*(batcher.submit(i) for i in range(3))), timeout=5)
+
+    assert asyncio.run(main()) == [0, 2, 4]
+    assert batch_fn.batches == [[0, 1, 2]]
+
+
+def test_flushes_partial_batch_when_window_expires():
+    batch_fn = RecordingBatchFn()
+    batcher = MicroBatcher(batch_fn, max_batch=100, window_ms=10)
+
+    async def main():
+        return await asyncio.wait_for(asyncio.gather(batcher.submit(1), batcher.submit(2)), timeout=5)
+
+    assert asyncio.run(main()) == [2, 4]
+    assert batch_fn.batches == [[1, 2]]
+
+
+def test_batch_exception_reaches_every_caller():
+    def failing(items):
+        raise ValueError("store unavailable")
+
+    batcher = MicroBatcher(failing, max_batch=2, window_ms=10)
+
+    async def main():
+        return await asyncio.wait_for(
+            asyncio.gather(batcher.submit("a"), batcher.submit("b"), return_exceptions=True), timeout=5
+        )
+
+    results = asyncio.run(main())
+    assert all(isinstance(result, ValueError) for result in results)
+
+
+def test_short_result_list_fails_callers_instead_of_hanging():
+    batcher = MicroBatcher(lambda items: items[:1], max_batch=3, window_ms=10)
+
+    async def main():
+        return await asyncio.wait_for(
+            asyncio.gather(*(batcher.submit(i) for i in range(3)), return_exceptions=True), timeout=5
+        )
+
+    results = asyncio.run(main())
+    assert len(results) == 3
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+def test_works_again_on_a_new_event_loop():
+    batch_fn = RecordingBatchFn()
+    batcher = MicroBatcher(batch_fn, max_batch=100, window_ms=10)
+
+    async def main(value):
+        return await asyncio.wait_for(batcher.submit(value), timeout=5)
+
+    # Each asyncio.run uses a fresh loop; the batcher must rebind instead of using stale state
+    assert asyncio.run(main(1)) == 2
+    assert asyncio.run(main(5)) == 10
+    assert batch_fn.batches == [[1], [5]]
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
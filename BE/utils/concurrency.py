@@ -0,0 +1,121 @@
+"""
+Shared event loop for running the async services from synchronous (Flask) code
+"""
+import asyncio
+import contextvars
+import functools
+import threading
+from typing import Any, Callable, Coroutine, List, Tuple
+
+try:
+    import uvloop
+    UVLOOP_AVAILABLE = True
+except ImportError:
+    UVLOOP_AVAILABLE = False
+
+_loop = None
+_loop_lock = threading.Lock()
+
+
+def _new_loop() -> asyncio.AbstractEventLoop:
+    # libuv-backed loop when uvloop is installed (not available on Windows)
+    loop = uvloop.new_event_loop() if UVLOOP_AVAILABLE else asyncio.new_event_loop()
+    # Coroutines that finish without suspending (cache hits) skip task scheduling (3.12+)
+    if hasattr(asyncio, "eager_task_factory"):
+        loop.set_task_factory(asyncio.eager_task_factory)
+    return loop
+
+
+def get_event_loop() -> asyncio.AbstractEventLoop:
+    """Process-wide event loop running in a daemon thread, started on first use"""
+    global _loop
+    with _loop_lock:
+        if _loop is None or _loop.is_closed():
+            loop = _new_loop()
+            threading.Thread(target=loop.run_forever, name="compliance-loop", daemon=True).start()
+            _loop = loop
+        return _loop
+
+
+def run(coro: Coroutine) -> Any:
+    """asyncio.run on the fastest available loop - the entry point for command-line scripts"""
+    with asyncio.Runner(loop_factory=_new_loop) as runner:
+        return runner.run(coro)
+
+
+def run_async(coro: Coroutine) -> Any:
+    """Run coro on the shared loop and block the calling thread until it finishes.
+
+    Requests share one loop instead of building and tearing one down each, so
+    per-loop state (agent semaphore, in-flight LLM requests) spans requests.
+    """
+    return asyncio.run_coroutine_threadsafe(coro, get_event_loop()).result()
+
+
+async def run_blocking(fn: Callable, *args, **kwargs) -> Any:
+    """asyncio.to_thread, minus the context copy and wrapper when no context variables are set"""
+    loop = asyncio.get_running_loop()
+    ctx = contextvars.copy_context()
+    if len(ctx):
+        return await loop.run_in_executor(None, functools.partial(ctx.run, fn, *args, **kwargs))
+    if kwargs:
+        fn = functools.partial(fn, **kwargs)
+    return await loop.run_in_executor(None, fn, *args)
+
+
+class MicroBatcher:
+    """Coalesce concurrent single-item calls into batched calls of a blocking function.
+
+    Items submitted within window_ms of each other (up to max_batch) are passed
+    together to batch_fn in a worker thread; batch_fn returns one result per item,
+    in order, and each caller receives its own.
+    """
+
+    def __init__(self, batch_fn: Callable[[List[Any]], List[Any]], max_batch: int = 16, window_ms: float = 5):
+        self.batch_fn = batch_fn
+        self.max_batch = max_batch
+        self.window = window_ms / 1000
+        self._loop = None
+        self._pending = []
+        self._timer = None
+        self._running = set()
+
+    async def submit(self, item: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Futures belong to one loop - start fresh when called from a new one
+            self._loop = loop
+            self._pending = []
+            self._timer = None
+        future = loop.create_future()
+        self._pending.append((item, future))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = self._loop.create_task(self._run(batch))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _run(self, batch: List[Tuple[Any, asyncio.Future]]):
+        try:
+            results = await run_blocking(self.batch_fn, [item for item, _ in batch])
+            if len(results) != len(batch):
+                # Results can't be matched to callers any more - fail them all rather than leave some hanging
+                raise RuntimeError(f"batch function returned {len(results)} results for {len(batch)} items")
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
@@ -0,0 +1,36 @@
+"""
+Multi-keyword substring matching in a single pass over the text
+"""
+from typing import Iterable, Set
+
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+
+class KeywordMatcher:
+    """Report which of a fixed set of keywords occur in a text (plain substring semantics).
+
+    Uses an Aho-Corasick automaton when pyahocorasick is installed, so the text
+    is scanned once no matter how many keywords there are; otherwise falls back
+    to one substring check per keyword.
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords = tuple(dict.fromkeys(keywords))
+        self._automaton = None
+
+        if AHOCORASICK_AVAILABLE and self.keywords:
+            automaton = ahocorasick.Automaton()
+            for keyword in self.keywords:
+                automaton.add_word(keyword, keyword)
+            automaton.make_automaton()
+            self._automaton = automaton
+
+    def present(self, text: str) -> Set[str]:
+        """Return the keywords that appear anywhere in text (overlapping matches included)"""
+        if self._automaton is not None:
+            return {keyword for _, keyword in self._automaton.iter(text)}
+        return {keyword for keyword in self.keywords if keyword in text}
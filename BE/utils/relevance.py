@@ -1,132 +1,196 @@
 import re
-from typing import List, Dict, Set
+from functools import lru_cache
+from typing import List, Dict, Set, Tuple
 from config import ComplianceConfig
+from utils.keyword_matcher import KeywordMatcher
+
+# State names and compliance topics, lowercased once; each list is matched in a single pass
+_STATES = tuple((state.lower(), state) for state in ComplianceConfig.US_STATES)
+_STATE_MATCHER = KeywordMatcher(lower for lower, _ in _STATES)
+
+_STATE_ABBREVIATIONS = {
+    "ca": "California", "ny": "New York", "tx": "Texas", "fl": "Florida",
+    "ut": "Utah", "wa": "Washington", "or": "Oregon", "nv": "Nevada"
+}
+# Standalone abbreviations, delimited by any non-word character (comma, newline, ...)
+_STATE_ABBREVIATION_RE = re.compile(r"\b(" + "|".join(_STATE_ABBREVIATIONS) + r")\b")
+
+_TOPICS = tuple((topic.lower(), topic) for topic in ComplianceConfig.COMPLIANCE_TOPICS)
+_TOPIC_MATCHER = KeywordMatcher(lower for lower, _ in _TOPICS)
+
+# Additional topic detection patterns, compiled once. Each stays a separate regex: its
+# literal prefix ("age", "parent", ...) lets the engine skip ahead quickly, which an
+# alternation of patterns (per topic or across topics) can't do - that measured several times slower
+_TOPIC_PATTERNS = {
+    topic: tuple(re.compile(pattern) for pattern in patterns)
+    for topic, patterns in {
+        "age_verification": [r"age.{0,10}verify", r"age.{0,10}check", r"verify.{0,10}age"],
+        "parental_consent": [r"parent.{0,10}consent", r"guardian.{0,10}approval"],
+        "data_collection": [r"data.{0,10}collect", r"collect.{0,10}data", r"user.{0,10}data"],
+        "content_filtering": [r"content.{0,10}filter", r"filter.{0,10}content", r"block.{0,10}content"],
+        "time_restrictions": [r"time.{0,10}restrict", r"curfew", r"hours.{0,10}limit"]
+    }.items()
+}
+
+# Keyword lists for the small predicates below. These stay plain substring checks:
+# with a handful of keywords, any() stops at the first hit, which beats walking every
+# automaton hit in a long statute
+_REGULATION_KEYWORDS = (
+    "coppa", "sb-976", "sb976", "house bill", "senate bill",
+    "digital services act", "dsa", "gdpr", "ccpa", "ferpa"
+)
+
+_MOCK_INDICATORS = (
+    "mock analysis",
+    "error processing",
+    "key considerations include user age verification, data protection, and geographical restrictions"
+)
+_MEANINGFUL_INDICATORS = (
+    "requires", "must", "shall", "compliance", "violation",
+    "penalty", "fine", "liability", "obligation", "prohibited"
+)
+
+_HIGH_SEVERITY_KEYWORDS = (
+    "violation", "penalty", "fine", "criminal", "felony", "misdemeanor",
+    "prohibited", "illegal", "ban", "suspend", "revoke"
+)
+_MEDIUM_SEVERITY_KEYWORDS = (
+    "requires", "must", "shall", "mandatory", "obligation", "duty"
+)
+
+# Action item per extracted topic
+_KEYWORD_ACTIONS = {
+    'age_verification': "Implement robust age verification system",
+    'parental_consent': "Design parental consent workflow",
+    'data_collection': "Review and limit data collection practices",
+    'content_filtering': "Implement content filtering mechanisms",
+    'time_restrictions': "Add time-based access controls",
+    'minors': "Create minor-specific user flows",
+    'privacy': "Conduct privacy impact assessment",
+    'algorithmic transparency': "Document algorithmic decision-making processes"
+}
 
 def extract_locations(text: str) -> List[str]:
     """Extract geographic locations from text"""
-    locations = []
-    text_lower = text.lower()
-    
-    for state in ComplianceConfig.US_STATES:
-        if state.lower() in text_lower:
-            locations.append(state)
+    return list(_extract_locations_lower(text.lower()))
+
+# The helpers below take text that is already lowercased, so calculate_relevance_score
+# lowers each text once. The same feature description is scored against every retrieved
+# statute (and statutes recur across features), so each distinct text is only scanned once
+@lru_cache(maxsize=4096)
+def _extract_locations_lower(text_lower: str) -> Tuple[str, ...]:
+    found = _STATE_MATCHER.present(text_lower)
+    locations = [state for lower, state in _STATES if lower in found]
     
     # Also check for common abbreviations
-    state_abbreviations = {
-        "ca": "California", "ny": "New York", "tx": "Texas", "fl": "Florida",
-        "ut": "Utah", "wa": "Washington", "or": "Oregon", "nv": "Nevada"
-    }
-    
-    for abbr, full_name in state_abbreviations.items():
-        if f" {abbr} " in f" {text_lower} " or f" {abbr}." in text_lower:
-            if full_name not in locations:
-                locations.append(full_name)
+    abbreviations = {match.group(1) for match in _STATE_ABBREVIATION_RE.finditer(text_lower)}
+    for abbr, full_name in _STATE_ABBREVIATIONS.items():
+        if abbr in abbreviations and full_name not in locations:
+            locations.append(full_name)
     
-    return locations
+    return tuple(locations)
 
 def extract_key_topics(text: str) -> List[str]:
     """Extract key compliance topics from text"""
-    topics = []
-    text_lower = text.lower()
-    
-    for topic in ComplianceConfig.COMPLIANCE_TOPICS:
-        if topic.lower() in text_lower:
-            topics.append(topic)
-    
-    # Additional topic detection patterns
-    topic_patterns = {
-        "age_verification": [r"age.{0,10}verify", r"age.{0,10}check", r"verify.{0,10}age"],
-        "parental_consent": [r"parent.{0,10}consent", r"guardian.{0,10}approval"],
-        "data_collection": [r"data.{0,10}collect", r"collect.{0,10}data", r"user.{0,10}data"],
-        "content_filtering": [r"content.{0,10}filter", r"filter.{0,10}content", r"block.{0,10}content"],
-        "time_restrictions": [r"time.{0,10}restrict", r"curfew", r"hours.{0,10}limit"]
-    }
+    return list(_extract_key_topics_lower(text.lower()))
+
+@lru_cache(maxsize=4096)
+def _extract_key_topics_lower(text_lower: str) -> Tuple[str, ...]:
+    found = _TOPIC_MATCHER.present(text_lower)
+    topics = {topic for lower, topic in _TOPICS if lower in found}
     
-    for topic, patterns in topic_patterns.items():
-        for pattern in patterns:
-            if re.search(pattern, text_lower):
-                topics.append(topic)
-                break
+    # Additional topic detection patterns (skipped for topics already found)
+    for topic, patterns in _TOPIC_PATTERNS.items():
+        if topic not in topics and any(pattern.search(text_lower) for pattern in patterns):
+            topics.add(topic)
     
-    return list(set(topics))  # Remove duplicates
+    return tuple(topics)
 
 def has_specific_regulation_match(feature_description: str, statute_content: str) -> bool:
     """Check if feature has specific regulation matches"""
-    feature_lower = feature_description.lower()
-    statute_lower = statute_content.lower()
-    
-    # Specific regulation keywords
-    regulation_keywords = [
-        "coppa", "sb-976", "sb976", "house bill", "senate bill",
-        "digital services act", "dsa", "gdpr", "ccpa", "ferpa"
-    ]
-    
-    feature_regulations = set()
-    statute_regulations = set()
-    
-    for keyword in regulation_keywords:
-        if keyword in feature_lower:
-            feature_regulations.add(keyword)
-        if keyword in statute_lower:
-            statute_regulations.add(keyword)
-    
-    return len(feature_regulations & statute_regulations) > 0
+    return _has_specific_regulation_match_lower(feature_description.lower(), statute_content.lower())
 
-def calculate_relevance_score(feature_description: str, statute_content: str, statute_metadata: Dict) -> float:
-    """Calculate relevance score based on multiple factors"""
-    score = 0.0
-    
-    # Geographic relevance (40% weight)
-    feature_locations = set(extract_locations(feature_description))
-    statute_locations = set(extract_locations(statute_content))
-    if feature_locations & statute_locations:
-        score += 0.4
-    elif feature_locations and not statute_locations:
-        # If feature is location-specific but statute isn't, lower relevance
-        score += 0.1
-    elif not feature_locations:
-        # If no specific location in feature, federal/general laws are relevant
-        score += 0.2
-    
-    # Topic relevance (40% weight)
-    feature_topics = set(extract_key_topics(feature_description))
-    statute_topics = set(extract_key_topics(statute_content))
-    topic_overlap = len(feature_topics & statute_topics)
-    topic_score = min(topic_overlap * 0.1, 0.4)
-    score += topic_score
-    
-    # Specific regulation matching (20% weight)
-    if has_specific_regulation_match(feature_description, statute_content):
-        score += 0.2
-    
-    # Content type bonus
-    if statute_metadata.get('content_type') == 'legal_statute':
-        score += 0.05
-    
-    return min(score, 1.0)  # Cap at 1.0
+def _has_specific_regulation_match_lower(feature_lower: str, statute_lower: str) -> bool:
+    # Only the regulations the (short) feature text names are looked up in the (long)
+    # statute, and the statute scan stops at the first shared one
+    feature_regulations = [keyword for keyword in _REGULATION_KEYWORDS if keyword in feature_lower]
+    if not feature_regulations:
+        return False
+    
+    return any(keyword in statute_lower for keyword in feature_regulations)
+
+def calculate_relevance_score(feature_description: str, statute_content: str, statute_metadata: Dict,
+                              min_score: float = 0.0) -> float:
+    """Calculate relevance score based on multiple factors.
+
+    When the score can no longer reach min_score, the (costliest) topic scan is skipped
+    and a partial score below min_score is returned.
+    """
+    return calculate_relevance_scores(feature_description, [statute_content], [statute_metadata], min_score)[0]
+
+def calculate_relevance_scores(feature_description: str, statute_contents: List[str],
+                               statute_metadatas: List[Dict], min_score: float = 0.0) -> List[float]:
+    """calculate_relevance_score for one feature against several statutes, in order.
+
+    The feature's locations, regulations and topics are extracted once for the batch.
+    """
+    feature_lower = feature_description.lower()
+    feature_locations = set(_extract_locations_lower(feature_lower))
+    feature_regulations = [keyword for keyword in _REGULATION_KEYWORDS if keyword in feature_lower]
+    feature_topics = None
+    scores = []
+    
+    for statute_content, statute_metadata in zip(statute_contents, statute_metadatas):
+        statute_lower = statute_content.lower()
+        
+        # Geographic relevance (40% weight)
+        if not feature_locations:
+            # If no specific location in feature, federal/general laws are relevant
+            # (the statute's own locations don't matter, so it isn't scanned for them)
+            geographic_score = 0.2
+        else:
+            statute_locations = set(_extract_locations_lower(statute_lower))
+            if feature_locations & statute_locations:
+                geographic_score = 0.4
+            elif not statute_locations:
+                # If feature is location-specific but statute isn't, lower relevance
+                geographic_score = 0.1
+            else:
+                geographic_score = 0.0
+        
+        # Specific regulation matching (20% weight)
+        regulation_score = 0.2 if any(keyword in statute_lower for keyword in feature_regulations) else 0.0
+        
+        # Content type bonus
+        content_bonus = 0.05 if statute_metadata.get('content_type') == 'legal_statute' else 0.0
+        
+        # Topic relevance (40% weight) - only worth scanning for if it can lift the score to min_score
+        if geographic_score + 0.4 + regulation_score + content_bonus < min_score:
+            scores.append(geographic_score + regulation_score + content_bonus)
+            continue
+        
+        if feature_topics is None:
+            feature_topics = set(_extract_key_topics_lower(feature_lower))
+        statute_topics = set(_extract_key_topics_lower(statute_lower))
+        topic_overlap = len(feature_topics & statute_topics)
+        topic_score = min(topic_overlap * 0.1, 0.4)
+        
+        # Summed in the original order so scores (and threshold comparisons) are unchanged
+        score = geographic_score + topic_score + regulation_score + content_bonus
+        scores.append(min(score, 1.0))  # Cap at 1.0
+    
+    return scores
 
 def is_relevant_compliance(compliance_flag: Dict) -> bool:
     """Determine if a compliance flag is relevant (not a mock response)"""
     flag_text = compliance_flag.get('compliance_flag', '').lower()
     
     # Filter out mock responses and low-quality results
-    mock_indicators = [
-        "mock analysis",
-        "error processing",
-        "key considerations include user age verification, data protection, and geographical restrictions"
-    ]
-    
-    for indicator in mock_indicators:
-        if indicator.lower() in flag_text:
-            return False
+    if any(indicator in flag_text for indicator in _MOCK_INDICATORS):
+        return False
     
     # Check for meaningful content
-    meaningful_indicators = [
-        "requires", "must", "shall", "compliance", "violation",
-        "penalty", "fine", "liability", "obligation", "prohibited"
-    ]
-    
-    return any(indicator in flag_text for indicator in meaningful_indicators)
+    return any(indicator in flag_text for indicator in _MEANINGFUL_INDICATORS)
 
 def parse_compliance_requirements(compliance_flag: Dict) -> Dict:
     """Parse compliance requirements from LLM response"""
@@ -134,28 +198,19 @@ def parse_compliance_requirements(compliance_flag: Dict) -> Dict:
     statute = compliance_flag.get('statute', '')
     
     # Determine severity based on keywords
-    high_severity_keywords = [
-        "violation", "penalty", "fine", "criminal", "felony", "misdemeanor",
-        "prohibited", "illegal", "ban", "suspend", "revoke"
-    ]
-    
-    medium_severity_keywords = [
-        "requires", "must", "shall", "mandatory", "obligation", "duty"
-    ]
-    
     severity = "low"
     flag_lower = flag_text.lower()
     
-    if any(keyword in flag_lower for keyword in high_severity_keywords):
+    if any(keyword in flag_lower for keyword in _HIGH_SEVERITY_KEYWORDS):
         severity = "high"
-    elif any(keyword in flag_lower for keyword in medium_severity_keywords):
+    elif any(keyword in flag_lower for keyword in _MEDIUM_SEVERITY_KEYWORDS):
         severity = "medium"
     
     return {
         'statute': statute,
         'requirements': flag_text,
         'severity': severity,
-        'keywords': extract_key_topics(flag_text)
+        'keywords': list(_extract_key_topics_lower(flag_lower))
     }
 
 def generate_action_items(compliance_req: Dict) -> List[str]:
@@ -165,20 +220,9 @@ def generate_action_items(compliance_req: Dict) -> List[str]:
     severity = compliance_req.get('severity', 'low')
     
     # Base action items based on keywords
-    keyword_actions = {
-        'age_verification': "Implement robust age verification system",
-        'parental_consent': "Design parental consent workflow",
-        'data_collection': "Review and limit data collection practices",
-        'content_filtering': "Implement content filtering mechanisms",
-        'time_restrictions': "Add time-based access controls",
-        'minors': "Create minor-specific user flows",
-        'privacy': "Conduct privacy impact assessment",
-        'algorithmic transparency': "Document algorithmic decision-making processes"
-    }
-    
     for keyword in keywords:
-        if keyword in keyword_actions:
-            action_items.append(keyword_actions[keyword])
+        if keyword in _KEYWORD_ACTIONS:
+            action_items.append(_KEYWORD_ACTIONS[keyword])
     
     # Severity-based action items
     if severity == "high":
@@ -188,4 +232,4 @@ def generate_action_items(compliance_req: Dict) -> List[str]:
         action_items.insert(0, "⚠️ Important: Compliance review needed")
         action_items.append("Document compliance measures")
     
-    return list(set(action_items))  # Remove duplicates
+    return list(dict.fromkeys(action_items))  # Remove duplicates, keeping urgent items first
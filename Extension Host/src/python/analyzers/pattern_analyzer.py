@@ -9,13 +9,18 @@ import re
 import ast
 import sys
 import os
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
 
 # Add parent directory to path for imports
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if parent_dir not in sys.path:
+    sys.path.insert(0, parent_dir)
 
 from compliance_types.compliance_types import CompliancePattern
-from utils.helpers import extract_code_snippets, normalize_pattern_name
+from utils.helpers import extract_code_snippets, normalize_pattern_name, newline_offsets, line_number
+from utils.keyword_tables import (
+    PRIVACY_KEYWORDS, PRIVACY_KEYWORD_MATCHER, REGULATION_MAP, DEFAULT_REGULATIONS
+)
 
 
 class PatternAnalyzer:
@@ -27,11 +32,57 @@ class PatternAnalyzer:
     potential compliance issues in source code.
     """
     
-    def __init__(self):
-        """Initialize the pattern analyzer with compliance patterns and keywords."""
-        self.compliance_patterns = self._load_compliance_patterns()
-        self.privacy_keywords = self._load_privacy_keywords()
-        self.data_collection_patterns = self._load_data_collection_patterns()
+    # Regex-based compliance patterns
+    COMPLIANCE_PATTERNS = {
+        'age_verification': {
+            'regex': r'(age[_\s]*verif|check[_\s]*age|verify[_\s]*age|under[_\s]*\d+)',
+            'confidence': 0.8,
+            'description': 'Age verification logic',
+            'regulations': ('COPPA', 'Utah Social Media Act')
+        },
+        'data_collection': {
+            'regex': r'(collect[_\s]*data|gather[_\s]*info|track[_\s]*user|store[_\s]*personal)',
+            'confidence': 0.7,
+            'description': 'Data collection activity',
+            'regulations': ('GDPR', 'CCPA', 'COPPA')
+        },
+        'location_tracking': {
+            'regex': r'(geo[_\s]*location|gps[_\s]*coord|track[_\s]*location|user[_\s]*location)',
+            'confidence': 0.8,
+            'description': 'Location tracking functionality',
+            'regulations': ('GDPR', 'CCPA')
+        },
+        'parental_consent': {
+            'regex': r'(parent[_\s]*consent|guardian[_\s]*approval|parental[_\s]*permission)',
+            'confidence': 0.9,
+            'description': 'Parental consent mechanism',
+            'regulations': ('COPPA',)
+        }
+    }
+    
+    # Data collection verbs
+    DATA_COLLECTION_PATTERNS = [
+        'collect', 'gather', 'store', 'save', 'record',
+        'capture', 'obtain', 'acquire', 'retrieve', 'fetch'
+    ]
+    
+    # Regexes compiled once per process, both for lowercased code and case-insensitively
+    # for the original (kept separate: one alternation of them scanned no faster, and it
+    # would drop matches that overlap a different pattern's)
+    _REGEX_PATTERNS = [
+        (name, config, re.compile(config['regex'], re.MULTILINE),
+         re.compile(config['regex'], re.IGNORECASE | re.MULTILINE))
+        for name, config in COMPLIANCE_PATTERNS.items() if config.get('regex')
+    ]
+    
+    # Regulations hinted by AST-detected data collection
+    AST_REGULATIONS = ('GDPR', 'COPPA')
+    
+    # Data collection functions flagged when called by name
+    AST_CALL_NAMES = frozenset({'collect_user_data', 'track_user', 'get_location'})
+    
+    # Variable names containing any of these look like data collection
+    _DATA_VARIABLE_RE = re.compile(r'age|location|personal|user_data')
     
     def find_patterns(self, code: str) -> List[CompliancePattern]:
         """
@@ -44,49 +95,59 @@ class PatternAnalyzer:
             List of CompliancePattern objects representing detected patterns
         """
         patterns = []
+        # Newline positions and lowercased code, shared by the regex and keyword scans
+        newlines = newline_offsets(code)
+        code_lower = code.lower()
         
         # Find regex-based patterns
-        patterns.extend(self._find_regex_patterns(code))
+        patterns.extend(self._find_regex_patterns(code, newlines, code_lower))
         
         # Find AST-based patterns (for Python code)
         patterns.extend(self._find_ast_patterns(code))
         
         # Find keyword-based patterns
-        patterns.extend(self._find_keyword_patterns(code))
+        patterns.extend(self._find_keyword_patterns(code, newlines, code_lower))
         
         return patterns
     
-    def _find_regex_patterns(self, code: str) -> List[CompliancePattern]:
+    def _find_regex_patterns(self, code: str, newlines: Optional[List[int]] = None,
+                             code_lower: Optional[str] = None) -> List[CompliancePattern]:
         """
         Find patterns using regex matching.
         
         Args:
             code: Source code to analyze
+            newlines: Newline offsets of code (computed if not given)
+            code_lower: code.lower() (computed if not given)
             
         Returns:
             List of patterns found via regex matching
         """
         patterns = []
+        if newlines is None:
+            newlines = newline_offsets(code)
+        if code_lower is None:
+            code_lower = code.lower()
         
-        for pattern_name, pattern_config in self.compliance_patterns.items():
-            regex = pattern_config.get('regex')
-            if not regex:
-                continue
-                
-            matches = re.finditer(regex, code, re.IGNORECASE | re.MULTILINE)
+        # The patterns are lowercase, so matching lowercased code equals IGNORECASE and is
+        # several times faster; the rare code whose offsets lowercasing shifts keeps IGNORECASE
+        use_lower = len(code_lower) == len(code)
+        
+        for pattern_name, pattern_config, regex, regex_ignorecase in self._REGEX_PATTERNS:
+            matches = regex.finditer(code_lower) if use_lower else regex_ignorecase.finditer(code)
             
             for match in matches:
                 # Get line number
-                line_num = code[:match.start()].count('\n') + 1
+                line_num = line_number(newlines, match.start())
                 
                 pattern = CompliancePattern(
                     pattern_type="regex",
                     pattern_name=pattern_name,
                     confidence=pattern_config.get('confidence', 0.7),
                     location=f"line {line_num}",
-                    code_snippet=match.group(0),
+                    code_snippet=code[match.start():match.end()],
                     description=pattern_config.get('description', ''),
-                    regulation_hints=pattern_config.get('regulations', [])
+                    regulation_hints=pattern_config.get('regulations', ())
                 )
                 patterns.append(pattern)
         
@@ -96,6 +157,11 @@ class PatternAnalyzer:
         """Find patterns using AST analysis (Python-specific)"""
         patterns = []
         
+        # Only a call to one of AST_CALL_NAMES or an assignment can produce a pattern, so
+        # code containing neither isn't worth parsing (ast.parse dominates this method)
+        if '=' not in code and not any(name in code for name in self.AST_CALL_NAMES):
+            return patterns
+        
         try:
             tree = ast.parse(code)
             
@@ -104,7 +170,7 @@ class PatternAnalyzer:
                 if isinstance(node, ast.Call) and isinstance(node.func, ast.Name):
                     func_name = node.func.id
                     
-                    if func_name in ['collect_user_data', 'track_user', 'get_location']:
+                    if func_name in self.AST_CALL_NAMES:
                         pattern = CompliancePattern(
                             pattern_type="ast_call",
                             pattern_name=f"data_collection_{func_name}",
@@ -112,7 +178,7 @@ class PatternAnalyzer:
                             location=f"line {node.lineno}",
                             code_snippet=func_name,
                             description=f"Data collection function: {func_name}",
-                            regulation_hints=['GDPR', 'COPPA']
+                            regulation_hints=self.AST_REGULATIONS
                         )
                         patterns.append(pattern)
                 
@@ -121,7 +187,7 @@ class PatternAnalyzer:
                     for target in node.targets:
                         if isinstance(target, ast.Name):
                             var_name = target.id.lower()
-                            if any(keyword in var_name for keyword in ['age', 'location', 'personal', 'user_data']):
+                            if self._DATA_VARIABLE_RE.search(var_name):
                                 pattern = CompliancePattern(
                                     pattern_type="ast_assignment",
                                     pattern_name=f"data_variable_{var_name}",
@@ -129,7 +195,7 @@ class PatternAnalyzer:
                                     location=f"line {node.lineno}",
                                     code_snippet=var_name,
                                     description=f"Data-related variable: {var_name}",
-                                    regulation_hints=['GDPR', 'COPPA']
+                                    regulation_hints=self.AST_REGULATIONS
                                 )
                                 patterns.append(pattern)
         
@@ -139,106 +205,36 @@ class PatternAnalyzer:
         
         return patterns
     
-    def _find_keyword_patterns(self, code: str) -> List[CompliancePattern]:
+    def _find_keyword_patterns(self, code: str, newlines: Optional[List[int]] = None,
+                               code_lower: Optional[str] = None) -> List[CompliancePattern]:
         """Find patterns based on privacy-related keywords"""
         patterns = []
-        code_lower = code.lower()
+        if newlines is None:
+            newlines = newline_offsets(code)
+        if code_lower is None:
+            code_lower = code.lower()
+        # All occurrences of every keyword, found in one pass
+        occurrences = PRIVACY_KEYWORD_MATCHER.occurrences(code_lower)
         
         # Check for privacy keywords
-        for category, keywords in self.privacy_keywords.items():
+        for category, keywords in PRIVACY_KEYWORDS.items():
             for keyword in keywords:
-                if keyword in code_lower:
-                    # Find all occurrences
-                    start = 0
-                    while True:
-                        pos = code_lower.find(keyword, start)
-                        if pos == -1:
-                            break
-                        
-                        line_num = code[:pos].count('\n') + 1
-                        
-                        pattern = CompliancePattern(
-                            pattern_type="keyword",
-                            pattern_name=f"{category}_{normalize_pattern_name(keyword)}",
-                            confidence=0.5,
-                            location=f"line {line_num}",
-                            code_snippet=keyword,
-                            description=f"{category.title()} keyword: {keyword}",
-                            regulation_hints=self._get_regulations_for_category(category)
-                        )
-                        patterns.append(pattern)
-                        start = pos + 1
+                for pos in occurrences.get(keyword, ()):
+                    line_num = line_number(newlines, pos)
+                    
+                    pattern = CompliancePattern(
+                        pattern_type="keyword",
+                        pattern_name=f"{category}_{normalize_pattern_name(keyword)}",
+                        confidence=0.5,
+                        location=f"line {line_num}",
+                        code_snippet=keyword,
+                        description=f"{category.title()} keyword: {keyword}",
+                        regulation_hints=self._get_regulations_for_category(category)
+                    )
+                    patterns.append(pattern)
         
         return patterns
     
-    def _load_compliance_patterns(self) -> Dict:
-        """Load regex-based compliance patterns"""
-        return {
-            'age_verification': {
-                'regex': r'(age[_\s]*verif|check[_\s]*age|verify[_\s]*age|under[_\s]*\d+)',
-                'confidence': 0.8,
-                'description': 'Age verification logic',
-                'regulations': ['COPPA', 'Utah Social Media Act']
-            },
-            'data_collection': {
-                'regex': r'(collect[_\s]*data|gather[_\s]*info|track[_\s]*user|store[_\s]*personal)',
-                'confidence': 0.7,
-                'description': 'Data collection activity',
-                'regulations': ['GDPR', 'CCPA', 'COPPA']
-            },
-            'location_tracking': {
-                'regex': r'(geo[_\s]*location|gps[_\s]*coord|track[_\s]*location|user[_\s]*location)',
-                'confidence': 0.8,
-                'description': 'Location tracking functionality',
-                'regulations': ['GDPR', 'CCPA']
-            },
-            'parental_consent': {
-                'regex': r'(parent[_\s]*consent|guardian[_\s]*approval|parental[_\s]*permission)',
-                'confidence': 0.9,
-                'description': 'Parental consent mechanism',
-                'regulations': ['COPPA']
-            }
-        }
-    
-    def _load_privacy_keywords(self) -> Dict[str, List[str]]:
-        """Load privacy-related keywords by category"""
-        return {
-            'personal_data': [
-                'personal_data', 'user_data', 'personal_info', 'pii',
-                'personally_identifiable', 'user_profile', 'profile_data'
-            ],
-            'tracking': [
-                'track_user', 'user_tracking', 'behavior_tracking', 'activity_tracking',
-                'analytics', 'usage_analytics', 'tracking_pixel'
-            ],
-            'age_related': [
-                'age', 'date_of_birth', 'birth_date', 'minor', 'child',
-                'under_13', 'underage', 'youth', 'juvenile'
-            ],
-            'location': [
-                'location', 'gps', 'coordinates', 'latitude', 'longitude',
-                'geolocation', 'geoip', 'geo_data', 'location_data'
-            ],
-            'consent': [
-                'consent', 'permission', 'agreement', 'acceptance',
-                'opt_in', 'opt_out', 'privacy_policy', 'terms_of_service'
-            ]
-        }
-    
-    def _load_data_collection_patterns(self) -> List[str]:
-        """Load data collection patterns"""
-        return [
-            'collect', 'gather', 'store', 'save', 'record',
-            'capture', 'obtain', 'acquire', 'retrieve', 'fetch'
-        ]
-    
-    def _get_regulations_for_category(self, category: str) -> List[str]:
-        """Get applicable regulations for a privacy category"""
-        regulation_map = {
-            'personal_data': ['GDPR', 'CCPA', 'COPPA'],
-            'tracking': ['GDPR', 'CCPA'],
-            'age_related': ['COPPA', 'Utah Social Media Act'],
-            'location': ['GDPR', 'CCPA'],
-            'consent': ['GDPR', 'CCPA', 'COPPA']
-        }
-        return regulation_map.get(category, ['GDPR'])
+    def _get_regulations_for_category(self, category: str) -> Tuple[str, ...]:
+        """Get applicable regulations for a privacy category (a shared tuple - don't mutate)"""
+        return REGULATION_MAP.get(category, DEFAULT_REGULATIONS)
@@ -11,10 +11,13 @@ from datetime import datetime
 from typing import List, Dict
 
 # Add parent directory to path for imports
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if parent_dir not in sys.path:
+    sys.path.insert(0, parent_dir)
 
 from compliance_types.compliance_types import ComplianceResult, CompliancePattern
 from utils.helpers import calculate_confidence
+from utils.keyword_tables import PRIVACY_KEYWORDS, PRIVACY_KEYWORD_MATCHER
 
 
 class SimpleAnalyzer:
@@ -25,11 +28,6 @@ class SimpleAnalyzer:
     analysis functionality when advanced LLM-based analysis is unavailable.
     """
     
-    def __init__(self):
-        """Initialize the analyzer with keyword dictionaries."""
-        self.privacy_keywords = self._load_privacy_keywords()
-        self.regulation_keywords = self._load_regulation_keywords()
-    
     def analyze(self, code: str, feature_name: str, patterns: List[CompliancePattern] = None) -> ComplianceResult:
         """
         Perform simple analysis based on keyword matching and patterns.
@@ -80,11 +78,11 @@ class SimpleAnalyzer:
     
     def _analyze_keywords(self, code: str) -> Dict[str, int]:
         """Analyze code for privacy-related keywords"""
-        code_lower = code.lower()
+        found = PRIVACY_KEYWORD_MATCHER.present(code.lower())
         scores = {}
         
-        for category, keywords in self.privacy_keywords.items():
-            score = sum(1 for keyword in keywords if keyword in code_lower)
+        for category, keywords in PRIVACY_KEYWORDS.items():
+            score = sum(1 for keyword in keywords if keyword in found)
             scores[category] = score
         
         return scores
@@ -204,36 +202,3 @@ class SimpleAnalyzer:
             return "REVIEW_REQUIRED"
         else:
             return "MONITOR"
-    
-    def _load_privacy_keywords(self) -> Dict[str, List[str]]:
-        """Load privacy-related keywords by category"""
-        return {
-            'personal_data': [
-                'personal_data', 'user_data', 'personal_info', 'pii',
-                'personally_identifiable', 'user_profile', 'profile_data'
-            ],
-            'tracking': [
-                'track_user', 'user_tracking', 'behavior_tracking', 'activity_tracking',
-                'analytics', 'usage_analytics', 'tracking_pixel'
-            ],
-            'age_related': [
-                'age', 'date_of_birth', 'birth_date', 'minor', 'child',
-                'under_13', 'underage', 'youth', 'juvenile'
-            ],
-            'location': [
-                'location', 'gps', 'coordinates', 'latitude', 'longitude',
-                'geolocation', 'geoip', 'geo_data', 'location_data'
-            ],
-            'consent': [
-                'consent', 'permission', 'agreement', 'acceptance',
-                'opt_in', 'opt_out', 'privacy_policy', 'terms_of_service'
-            ]
-        }
-    
-    def _load_regulation_keywords(self) -> Dict[str, List[str]]:
-        """Load regulation-specific keywords"""
-        return {
-            'COPPA': ['coppa', 'under_13', 'parental_consent', 'child', 'minor'],
-            'GDPR': ['gdpr', 'data_protection', 'right_to_be_forgotten', 'data_portability'],
-            'CCPA': ['ccpa', 'california', 'consumer_privacy', 'personal_information']
-        }
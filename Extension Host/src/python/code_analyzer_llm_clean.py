@@ -2,11 +2,43 @@ import ast
 import re
 import json
 import sys
+import copy
+import hashlib
+import threading
 import requests
+from bisect import bisect_left
+from collections import OrderedDict
 from typing import Dict, List, Set, Tuple, Optional
 from dataclasses import dataclass
 from config import ComplianceConfig
 
+_JSON_DECODER = json.JSONDecoder()
+# After the JSON object closes, read at most this many more stream lines so the body reaches
+# its end and the connection goes back to the session pool. A longer tail is abandoned instead:
+# leaving the response unread closes the connection, costing a new TLS handshake on the next call
+_STREAM_DRAIN_LINES = 16
+
+def _extract_json_object(text: str) -> Optional[Dict]:
+    """Decode the first complete JSON object embedded in text, in place.
+
+    raw_decode parses from an offset without slicing the response, stops at the
+    object's closing brace (trailing prose is ignored) and moves on to the next
+    '{' if one isn't the start of valid JSON. Returns None when text has no '{';
+    raises JSONDecodeError when none of the candidates parse.
+    """
+    start = text.find('{')
+    if start == -1:
+        return None
+    error = None
+    while start != -1:
+        try:
+            obj, _ = _JSON_DECODER.raw_decode(text, start)
+            return obj
+        except json.JSONDecodeError as e:
+            error = error or e
+            start = text.find('{', start + 1)
+    raise error
+
 @dataclass
 class CompliancePattern:
     """Represents a compliance pattern found in code"""
@@ -22,6 +54,9 @@ class CompliancePattern:
 class LLMCodeAnalyzer:
     """Enhanced code analyzer using LLM (Kimi v2) for intelligent compliance analysis"""
     
+    # Max analyses kept in the per-instance result cache
+    RESULT_CACHE_SIZE = 256
+    
     def __init__(self, use_llm: bool = True, force_llm: bool = False, vector_store=None):
         # Load configuration from .env file
         self.api_key = ComplianceConfig.OPENROUTER_API_KEY or ""
@@ -45,6 +80,18 @@ class LLMCodeAnalyzer:
         self.compliance_patterns = self._load_compliance_patterns()
         self.privacy_keywords = self._load_privacy_keywords()
         self.data_collection_patterns = self._load_data_collection_patterns()
+        
+        # LRU of finished analyses keyed by code signature + context
+        self._result_cache = OrderedDict()
+        # Features may be analyzed from several threads at once
+        self._cache_lock = threading.Lock()
+        
+        # Pooled HTTP session, so requests for successive (and concurrent) features reuse
+        # TCP/TLS connections instead of each opening its own
+        self._session = requests.Session()
+        self._session.mount("https://", requests.adapters.HTTPAdapter(
+            pool_maxsize=max(1, ComplianceConfig.MAX_PARALLEL_FEATURES)
+        ))
 
         # Print configuration status
         print(f"🔧 LLM Analyzer Configuration:", file=sys.stderr)
@@ -56,8 +103,22 @@ class LLMCodeAnalyzer:
         if not self.use_llm and not force_llm:
             print("⚠️  LLM analysis disabled - using static analysis only", file=sys.stderr)
     
+    def close(self):
+        """Close the pooled HTTP session"""
+        self._session.close()
+    
     def analyze_code_snippet(self, code: str, context: str = "") -> Dict:
         """Enhanced analysis combining static analysis with LLM insights"""
+        # Identical snippets (same source, same context) reuse the earlier result
+        cache_key = self._code_signature(code, context)
+        with self._cache_lock:
+            cached = self._result_cache.get(cache_key)
+            if cached is not None:
+                self._result_cache.move_to_end(cache_key)
+        if cached is not None:
+            print("♻️ Reusing cached analysis for identical code signature", file=sys.stderr)
+            return copy.deepcopy(cached)
+        
         # Start with static analysis
         static_analysis = self._perform_static_analysis(code, context)
         
@@ -66,13 +127,31 @@ class LLMCodeAnalyzer:
             try:
                 llm_analysis = self._perform_llm_analysis(code, context, static_analysis)
                 enhanced_analysis = self._merge_analyses(static_analysis, llm_analysis)
+                self._remember_result(cache_key, enhanced_analysis)
                 return enhanced_analysis
             except Exception as e:
+                # Not cached - the next call should retry the LLM
                 print(f"🤖 LLM analysis failed: {e}. Falling back to static analysis.")
                 return static_analysis
         
+        self._remember_result(cache_key, static_analysis)
         return static_analysis
     
+    def _code_signature(self, code: str, context: str) -> bytes:
+        """Signature of a snippet: exact source text plus context, since findings carry line numbers"""
+        digest = hashlib.blake2b(code.encode(), digest_size=16)
+        digest.update(b"\0")
+        digest.update(context.encode())
+        return digest.digest()
+    
+    def _remember_result(self, cache_key: bytes, analysis: Dict):
+        """Store a finished analysis, evicting the least recently used entry when full"""
+        analysis = copy.deepcopy(analysis)
+        with self._cache_lock:
+            self._result_cache[cache_key] = analysis
+            if len(self._result_cache) > self.RESULT_CACHE_SIZE:
+                self._result_cache.popitem(last=False)
+    
     def _perform_static_analysis(self, code: str, context: str = "") -> Dict:
         """Original static analysis method"""
         analysis = {
@@ -269,7 +348,11 @@ Analyze the following code for regulatory compliance issues, particularly focusi
             ],
             "max_tokens": 2000,
             "temperature": 0.3,  # Lower temperature for more consistent analysis
-            "top_p": 0.9
+            "top_p": 0.9,
+            # JSON mode: the prompt already asks for a JSON object, so have the provider enforce it
+            "response_format": {"type": "json_object"},
+            # Stream tokens so we can stop reading as soon as the JSON object is complete
+            "stream": True
         }
         
         print(f"🌐 Calling OpenRouter API...", file=sys.stderr)
@@ -277,11 +360,9 @@ Analyze the following code for regulatory compliance issues, particularly focusi
         print(f"   Endpoint: {url}", file=sys.stderr)
         
         try:
-            response = requests.post(url, headers=headers, json=data, timeout=timeout)
-            response.raise_for_status()
-            
-            result = response.json()
-            content = result["choices"][0]["message"]["content"]
+            with self._session.post(url, headers=headers, json=data, timeout=timeout, stream=True) as response:
+                response.raise_for_status()
+                content = self._read_stream(response)
             print(f"✅ OpenRouter API response received: {len(content)} characters", file=sys.stderr)
             return content
             
@@ -290,19 +371,59 @@ Analyze the following code for regulatory compliance issues, particularly focusi
             raise e
         except KeyError as e:
             print(f"❌ Unexpected API response format: {e}", file=sys.stderr)
-            print(f"   Response: {result if 'result' in locals() else 'No response'}", file=sys.stderr)
             raise e
     
+    def _read_stream(self, response) -> str:
+        """Assemble the streamed (SSE) completion, stopping once the JSON object closes"""
+        parts = []
+        depth = 0
+        # SSE responses usually carry no charset, which requests would decode as ISO-8859-1
+        response.encoding = "utf-8"
+        lines = response.iter_lines(decode_unicode=True)
+        for line in lines:
+            # Skip keep-alive comments (": OPENROUTER PROCESSING") and blank separators
+            if not line or not line.startswith("data: "):
+                continue
+            chunk = line[6:]
+            if chunk == "[DONE]":
+                break
+            result = json.loads(chunk)
+            if "error" in result:
+                raise requests.exceptions.RequestException(f"Stream error: {result['error']}")
+            delta = result["choices"][0].get("delta", {}).get("content") or ""
+            if not delta:
+                continue
+            parts.append(delta)
+            # Cheap brace count gates the real parse; braces inside strings only delay the check
+            depth += delta.count("{") - delta.count("}")
+            if depth <= 0 and "}" in delta:
+                content = "".join(parts)
+                start = content.find("{")
+                try:
+                    # Only a complete object from the first brace counts - a nested
+                    # object on its own doesn't mean the response is finished
+                    if start != -1:
+                        _JSON_DECODER.raw_decode(content, start)
+                        self._drain_stream(lines)
+                        return content
+                except json.JSONDecodeError:
+                    pass
+        self._drain_stream(lines)
+        return "".join(parts)
+    
+    @staticmethod
+    def _drain_stream(lines) -> None:
+        """Consume a short remaining tail so the pooled connection can be reused"""
+        for count, _ in enumerate(lines, 1):
+            if count >= _STREAM_DRAIN_LINES:
+                return
+    
     def _parse_llm_response(self, response: str, static_analysis: Dict) -> Dict:
         """Parse LLM response and structure the analysis"""
         try:
             # Try to extract JSON from response
-            json_start = response.find('{')
-            json_end = response.rfind('}') + 1
-            if json_start != -1 and json_end != -1:
-                json_str = response[json_start:json_end]
-                llm_data = json.loads(json_str)
-            else:
+            llm_data = _extract_json_object(response)
+            if llm_data is None:
                 # Fallback: create structured response from text
                 llm_data = self._extract_insights_from_text(response)
             
@@ -452,6 +573,8 @@ Analyze the following code for regulatory compliance issues, particularly focusi
         patterns = []
         privacy_concerns = []
         age_verification = []
+        # Newline positions, so each match's line number is a binary search
+        newlines = [match.start() for match in re.finditer('\n', code)]
         
         # Age verification patterns
         age_patterns = [
@@ -468,7 +591,7 @@ Analyze the following code for regulatory compliance issues, particularly focusi
                     pattern_type="age_verification",
                     pattern_name=pattern_name,
                     confidence=confidence,
-                    location=f"Line {self._get_line_number(code, match.start())}",
+                    location=f"Line {self._get_line_number(newlines, match.start())}",
                     code_snippet=match.group(),
                     description=f"Age verification pattern: {pattern_name}",
                     regulation_hints=["COPPA", "GDPR Article 8", "Age Appropriate Design Code"]
@@ -600,9 +723,9 @@ Analyze the following code for regulatory compliance issues, particularly focusi
         
         return recommendations
 
-    def _get_line_number(self, code: str, position: int) -> int:
-        """Get line number for a character position"""
-        return code[:position].count('\n') + 1
+    def _get_line_number(self, newlines: List[int], position: int) -> int:
+        """Get line number for a character position, given the code's newline offsets"""
+        return bisect_left(newlines, position) + 1
 
     def _pattern_to_dict(self, pattern: CompliancePattern) -> Dict:
         """Convert CompliancePattern to dictionary"""
@@ -13,11 +13,14 @@ services and legacy analyzer implementations.
 import json
 import sys
 import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, List, Any, Optional
+from typing import Callable, Dict, List, Any, Optional
 
 # Add the current directory to the path so we can import our modules
-sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+current_dir = os.path.dirname(os.path.abspath(__file__))
+if current_dir not in sys.path:
+    sys.path.insert(0, current_dir)
 
 # Try to use new modular services first
 try:
@@ -39,6 +42,31 @@ except ImportError as e:
     print(f"Warning: LLM components not available: {e}", file=sys.stderr)
     LLM_AVAILABLE = False
 
+from utils.keyword_matcher import KeywordMatcher
+
+# Define compliance keywords and patterns
+SIMPLE_PRIVACY_KEYWORDS = (
+    'user_data', 'personal_data', 'age', 'location', 'tracking',
+    'geoip', 'collect_user', 'user_profile', 'parental_consent',
+    'privacy_restrictions', 'geolocation', 'track_user'
+)
+
+SIMPLE_GDPR_KEYWORDS = (
+    'gdpr', 'consent', 'data_processing', 'user_consent',
+    'personal_information', 'data_collection', 'privacy_policy'
+)
+
+SIMPLE_COPPA_KEYWORDS = (
+    'coppa', 'under_13', 'age_verification', 'parental_consent',
+    'child_data', 'minor'
+)
+
+# One matcher over every keyword list (the implementation note triggers are among them),
+# so the code is scanned once instead of once per keyword
+_SIMPLE_KEYWORD_MATCHER = KeywordMatcher(
+    SIMPLE_PRIVACY_KEYWORDS + SIMPLE_GDPR_KEYWORDS + SIMPLE_COPPA_KEYWORDS
+)
+
 def analyze_code_for_compliance_simple(code: str, feature_name: str) -> Dict:
     """
     Simple fallback compliance analysis for code snippets when LLM is not available.
@@ -50,28 +78,11 @@ def analyze_code_for_compliance_simple(code: str, feature_name: str) -> Dict:
     Returns:
         Dictionary containing basic compliance analysis results
     """
-    # Define compliance keywords and patterns
-    privacy_keywords = [
-        'user_data', 'personal_data', 'age', 'location', 'tracking',
-        'geoip', 'collect_user', 'user_profile', 'parental_consent',
-        'privacy_restrictions', 'geolocation', 'track_user'
-    ]
-    
-    gdpr_keywords = [
-        'gdpr', 'consent', 'data_processing', 'user_consent',
-        'personal_information', 'data_collection', 'privacy_policy'
-    ]
-    
-    coppa_keywords = [
-        'coppa', 'under_13', 'age_verification', 'parental_consent',
-        'child_data', 'minor'
-    ]
-    
     # Count keyword occurrences
-    code_lower = code.lower()
-    privacy_score = sum(1 for keyword in privacy_keywords if keyword in code_lower)
-    gdpr_score = sum(1 for keyword in gdpr_keywords if keyword in code_lower)
-    coppa_score = sum(1 for keyword in coppa_keywords if keyword in code_lower)
+    found = _SIMPLE_KEYWORD_MATCHER.present(code.lower())
+    privacy_score = sum(1 for keyword in SIMPLE_PRIVACY_KEYWORDS if keyword in found)
+    gdpr_score = sum(1 for keyword in SIMPLE_GDPR_KEYWORDS if keyword in found)
+    coppa_score = sum(1 for keyword in SIMPLE_COPPA_KEYWORDS if keyword in found)
     
     total_score = privacy_score + gdpr_score + coppa_score
     
@@ -113,13 +124,13 @@ def analyze_code_for_compliance_simple(code: str, feature_name: str) -> Dict:
     
     # Generate implementation notes
     implementation_notes = []
-    if 'age' in code_lower:
+    if 'age' in found:
         implementation_notes.append("Implement age verification mechanism")
-    if 'location' in code_lower or 'geolocation' in code_lower:
+    if 'location' in found or 'geolocation' in found:
         implementation_notes.append("Add location consent prompts")
-    if 'user_data' in code_lower or 'personal_data' in code_lower:
+    if 'user_data' in found or 'personal_data' in found:
         implementation_notes.append("Ensure data encryption and secure storage")
-    if 'consent' in code_lower:
+    if 'consent' in found:
         implementation_notes.append("Implement proper consent management")
     
     # Determine action required
@@ -256,6 +267,18 @@ def analyze_code_for_compliance_llm(code: str, feature_name: str, analyzer: LLMC
         # Fallback to simple analysis
         return analyze_code_for_compliance_simple(code, feature_name)
 
+def _analyze_concurrently(analyze_one: Callable[[Dict], Any], features: List[Dict], max_workers: int) -> List[Any]:
+    """
+    Run analyze_one over every feature on a thread pool, since each analysis spends
+    most of its time waiting on an LLM request. Results come back in input order;
+    the first exception raised by an analysis propagates.
+    """
+    workers = min(max_workers, len(features))
+    if workers <= 1:
+        return [analyze_one(feature) for feature in features]
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="compliance-feature") as executor:
+        return list(executor.map(analyze_one, features))
+
 def analyze_features(features: List[Dict]) -> Dict:
     """
     Analyze multiple features for compliance using new modular services when available,
@@ -273,12 +296,17 @@ def analyze_features(features: List[Dict]) -> Dict:
             config = AnalysisConfig()
             compliance_service = ComplianceService(config)
             
-            for feature in features:
-                result = compliance_service.analyze_code(
+            # Submit every feature at once, then tally the results in input order
+            results = _analyze_concurrently(
+                lambda feature: compliance_service.analyze_code(
                     code=feature.get('code', ''),
                     feature_name=feature.get('feature_name', 'Unknown Feature')
-                )
-                
+                ),
+                features,
+                AnalysisConfig.MAX_PARALLEL_FEATURES
+            )
+            
+            for result in results:
                 # Convert to legacy format for backward compatibility
                 legacy_result = _convert_to_legacy_format(result)
                 detailed_results.append(legacy_result)
@@ -437,19 +465,32 @@ def _analyze_features_legacy(features: List[Dict]) -> Dict:
     if not analyzer:
         print("Using simple static analysis (fallback)", file=sys.stderr)
     
-    for feature in features:
-        if analyzer:
-            result = analyze_code_for_compliance_llm(
-                feature.get('code', ''),
-                feature.get('feature_name', 'Unknown Feature'),
-                analyzer
+    if analyzer:
+        # LLM-backed analyses are I/O-bound - run them concurrently, results in input order
+        try:
+            results = _analyze_concurrently(
+                lambda feature: analyze_code_for_compliance_llm(
+                    feature.get('code', ''),
+                    feature.get('feature_name', 'Unknown Feature'),
+                    analyzer
+                ),
+                features,
+                ComplianceConfig.MAX_PARALLEL_FEATURES
             )
-        else:
-            result = analyze_code_for_compliance_simple(
+        finally:
+            # Release the pooled HTTP session even when a worker raised
+            analyzer.close()
+    else:
+        # The static fallback is CPU-bound, so threads wouldn't help
+        results = [
+            analyze_code_for_compliance_simple(
                 feature.get('code', ''),
                 feature.get('feature_name', 'Unknown Feature')
             )
-        
+            for feature in features
+        ]
+    
+    for result in results:
         detailed_results.append(result)
         
         if result['needs_compliance_logic']:
@@ -7,7 +7,7 @@ response objects for different analysis components.
 """
 
 from dataclasses import dataclass
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Sequence
 from enum import Enum
 
 
@@ -39,7 +39,7 @@ class CompliancePattern:
     location: str
     code_snippet: str
     description: str
-    regulation_hints: List[str]
+    regulation_hints: Sequence[str]  # May be a tuple shared between patterns - don't mutate
     llm_analysis: Optional[str] = None
     severity: Optional[str] = None
     legal_basis: Optional[str] = None
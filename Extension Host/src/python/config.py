@@ -46,6 +46,8 @@ class ComplianceConfig:
     RELEVANCE_THRESHOLD = 0.5
     MAX_STATUTES_PER_FEATURE = 10
     BATCH_SIZE = 5
+    # Features analyzed concurrently (each analysis waits on an LLM request)
+    MAX_PARALLEL_FEATURES = int(os.getenv("COMPLIANCE_MAX_PARALLEL_FEATURES", "16"))
     
     # Cache Configuration
     ENABLE_CACHE = True
@@ -41,6 +41,8 @@ class AnalysisConfig:
     MAX_STATUTES_PER_FEATURE = 10
     BATCH_SIZE = 5
     MAX_PATTERNS = 20
+    # Features analyzed concurrently (each analysis waits on an LLM request)
+    MAX_PARALLEL_FEATURES = int(os.getenv("COMPLIANCE_MAX_PARALLEL_FEATURES", "16"))
     
     # Confidence thresholds
     HIGH_CONFIDENCE = 0.8
@@ -62,6 +64,7 @@ class ComplianceConfig:
     RELEVANCE_THRESHOLD = AnalysisConfig.RELEVANCE_THRESHOLD
     MAX_STATUTES_PER_FEATURE = AnalysisConfig.MAX_STATUTES_PER_FEATURE
     BATCH_SIZE = AnalysisConfig.BATCH_SIZE
+    MAX_PARALLEL_FEATURES = AnalysisConfig.MAX_PARALLEL_FEATURES
     EMBEDDING_MODEL = VectorConfig.EMBEDDING_MODEL
     VECTOR_DB_PATH = VectorConfig.VECTOR_DB_PATH
     
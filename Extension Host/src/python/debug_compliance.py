@@ -5,7 +5,9 @@ Debug script to find the exact source of the 'str' object error
 
 import sys
 import os
-sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+current_dir = os.path.dirname(os.path.abspath(__file__))
+if current_dir not in sys.path:
+    sys.path.insert(0, current_dir)
 
 from services.compliance_service import ComplianceService
 from analyzers.simple_analyzer import SimpleAnalyzer
@@ -15,7 +15,8 @@ from typing import Dict, List, Optional
 # Add parent directory to path for imports
 current_dir = os.path.dirname(os.path.abspath(__file__))
 parent_dir = os.path.dirname(current_dir)
-sys.path.insert(0, parent_dir)
+if parent_dir not in sys.path:
+    sys.path.insert(0, parent_dir)
 
 from config import APIConfig
 import compliance_types.compliance_types as ct
@@ -12,7 +12,8 @@ import os
 
 # Add the current directory to the path
 current_dir = os.path.dirname(os.path.abspath(__file__))
-sys.path.insert(0, current_dir)
+if current_dir not in sys.path:
+    sys.path.insert(0, current_dir)
 
 def test_basic_imports():
     """Test basic imports of core modules."""
@@ -4,6 +4,8 @@ Utility functions
 
 from .helpers import (
     extract_code_snippets,
+    newline_offsets,
+    line_number,
     calculate_confidence,
     format_compliance_output,
     log_error,
@@ -12,14 +14,18 @@ from .helpers import (
     safe_json_loads,
     normalize_pattern_name
 )
+from .keyword_matcher import KeywordMatcher
 
 __all__ = [
     'extract_code_snippets',
+    'newline_offsets',
+    'line_number',
     'calculate_confidence', 
     'format_compliance_output',
     'log_error',
     'log_info',
     'log_debug',
     'safe_json_loads',
-    'normalize_pattern_name'
+    'normalize_pattern_name',
+    'KeywordMatcher'
 ]
@@ -9,6 +9,7 @@ and data formatting operations.
 import re
 import json
 import sys
+from bisect import bisect_left
 from typing import List, Dict, Any, Optional
 
 
@@ -44,6 +45,38 @@ def extract_code_snippets(code: str, patterns: List[str]) -> List[Dict[str, str]
     return snippets
 
 
+def newline_offsets(code: str) -> List[int]:
+    """
+    Find the position of every newline in the code, in ascending order.
+    
+    Args:
+        code: Source code to index
+        
+    Returns:
+        Character offsets of each '\\n', for use with line_number
+    """
+    offsets = []
+    pos = code.find('\n')
+    while pos != -1:
+        offsets.append(pos)
+        pos = code.find('\n', pos + 1)
+    return offsets
+
+
+def line_number(newlines: List[int], position: int) -> int:
+    """
+    Get the 1-based line number of a character position.
+    
+    Args:
+        newlines: Newline offsets from newline_offsets
+        position: Character offset into the same code
+        
+    Returns:
+        Line number containing the position
+    """
+    return bisect_left(newlines, position) + 1
+
+
 def calculate_confidence(patterns_found: int, total_patterns: int, base_confidence: float = 0.5) -> float:
     """
     Calculate confidence score based on pattern matches.
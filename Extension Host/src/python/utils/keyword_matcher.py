@@ -0,0 +1,70 @@
+"""
+Multi-keyword substring matching in a single pass over the text.
+
+This module mirrors the backend matcher: an Aho-Corasick automaton is used when
+pyahocorasick is installed, with plain substring searches as the fallback.
+"""
+
+from typing import Dict, Iterable, List, Set
+
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+
+class KeywordMatcher:
+    """
+    Find a fixed set of keywords in a text (plain substring semantics).
+
+    With pyahocorasick the text is scanned once no matter how many keywords
+    there are; otherwise each keyword is searched for separately.
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        """
+        Build the matcher.
+
+        Args:
+            keywords: Keywords to look for (duplicates are ignored)
+        """
+        self.keywords = tuple(dict.fromkeys(keywords))
+        self._automaton = None
+
+        if AHOCORASICK_AVAILABLE and self.keywords:
+            automaton = ahocorasick.Automaton()
+            for keyword in self.keywords:
+                automaton.add_word(keyword, keyword)
+            automaton.make_automaton()
+            self._automaton = automaton
+
+    def present(self, text: str) -> Set[str]:
+        """Return the keywords that appear anywhere in text"""
+        if self._automaton is not None:
+            return {keyword for _, keyword in self._automaton.iter(text)}
+        return {keyword for keyword in self.keywords if keyword in text}
+
+    def occurrences(self, text: str) -> Dict[str, List[int]]:
+        """
+        Find every occurrence of every keyword, overlapping ones included.
+
+        Args:
+            text: Text to search
+
+        Returns:
+            Start offsets in ascending order, keyed by keyword (absent keywords are omitted)
+        """
+        found: Dict[str, List[int]] = {}
+
+        if self._automaton is not None:
+            for end, keyword in self._automaton.iter(text):
+                found.setdefault(keyword, []).append(end - len(keyword) + 1)
+            return found
+
+        for keyword in self.keywords:
+            pos = text.find(keyword)
+            while pos != -1:
+                found.setdefault(keyword, []).append(pos)
+                pos = text.find(keyword, pos + 1)
+        return found
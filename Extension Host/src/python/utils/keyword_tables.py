@@ -0,0 +1,57 @@
+"""
+Keyword tables shared by the rule-based analyzers.
+
+PatternAnalyzer and SimpleAnalyzer classify code against the same privacy
+keywords; defining them here keeps the two in step and builds the keyword
+matcher once per process.
+"""
+
+from .keyword_matcher import KeywordMatcher
+
+
+# Privacy-related keywords by category
+PRIVACY_KEYWORDS = {
+    'personal_data': (
+        'personal_data', 'user_data', 'personal_info', 'pii',
+        'personally_identifiable', 'user_profile', 'profile_data'
+    ),
+    'tracking': (
+        'track_user', 'user_tracking', 'behavior_tracking', 'activity_tracking',
+        'analytics', 'usage_analytics', 'tracking_pixel'
+    ),
+    'age_related': (
+        'age', 'date_of_birth', 'birth_date', 'minor', 'child',
+        'under_13', 'underage', 'youth', 'juvenile'
+    ),
+    'location': (
+        'location', 'gps', 'coordinates', 'latitude', 'longitude',
+        'geolocation', 'geoip', 'geo_data', 'location_data'
+    ),
+    'consent': (
+        'consent', 'permission', 'agreement', 'acceptance',
+        'opt_in', 'opt_out', 'privacy_policy', 'terms_of_service'
+    )
+}
+
+# Regulation-specific keywords
+REGULATION_KEYWORDS = {
+    'COPPA': ('coppa', 'under_13', 'parental_consent', 'child', 'minor'),
+    'GDPR': ('gdpr', 'data_protection', 'right_to_be_forgotten', 'data_portability'),
+    'CCPA': ('ccpa', 'california', 'consumer_privacy', 'personal_information')
+}
+
+# Applicable regulations per privacy category. Hints are shared tuples, not per-pattern
+# lists, so every pattern of a category references one immutable object
+REGULATION_MAP = {
+    'personal_data': ('GDPR', 'CCPA', 'COPPA'),
+    'tracking': ('GDPR', 'CCPA'),
+    'age_related': ('COPPA', 'Utah Social Media Act'),
+    'location': ('GDPR', 'CCPA'),
+    'consent': ('GDPR', 'CCPA', 'COPPA')
+}
+DEFAULT_REGULATIONS = ('GDPR',)
+
+# Every privacy keyword in one matcher, so code is scanned once rather than per keyword
+PRIVACY_KEYWORD_MATCHER = KeywordMatcher(
+    keyword for keywords in PRIVACY_KEYWORDS.values() for keyword in keywords
+)